@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+ASSETS_DIR = Path(__file__).resolve().parent / "assets"
+DIST_DIR = ASSETS_DIR / "dist"
+MANIFEST_PATH = DIST_DIR / "manifest.json"
+MANIFEST_FORMAT = 1
+FONTS_PATH = DIST_DIR / "fonts.json"
+
+
+@dataclass(frozen=True)
+class AssetManifest:
+    """Maps the asset paths used in the content pack to the hashed files
+    produced by tools/build_assets.py, and font families to the subsets from
+    tools/build_fonts.py. Without a manifest every path resolves to itself,
+    so a fresh checkout runs unchanged."""
+
+    images: Dict[str, dict] = field(default_factory=dict)
+    audio: Dict[str, dict] = field(default_factory=dict)
+    fonts: Dict[str, dict] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path = MANIFEST_PATH, fonts_path: Path = FONTS_PATH) -> "AssetManifest":
+        data = _read_manifest(path)
+        fonts = _read_manifest(fonts_path)
+        return cls(images=data.get("images", {}), audio=data.get("audio", {}), fonts=fonts.get("fonts", {}))
+
+    def image(self, path: str, height: int, density: float = 2.0, webp: bool = True) -> str:
+        """Returns the smallest variant that still covers height at the given pixel density."""
+        entry = self.images.get(path)
+        if entry is None:
+            return path
+        target = height * density
+        best: Optional[dict] = None
+        for variant in entry.get("variants", []):
+            if webp != (variant["format"] == "webp") or variant["height"] < target:
+                continue
+            if best is None or variant["height"] < best["height"]:
+                best = variant
+        return best["src"] if best else entry["src"]
+
+    def audio_src(self, path: str, max_kbps: Optional[int] = None) -> str:
+        """Returns the best rendition at or below max_kbps, or the original when unlimited."""
+        entry = self.audio.get(path)
+        if entry is None:
+            return path
+        if max_kbps is None:
+            return entry["src"]
+        fitting = [r for r in entry.get("renditions", []) if r["kbps"] <= max_kbps]
+        if not fitting:
+            return entry["src"]
+        return max(fitting, key=lambda r: r["kbps"])["src"]
+
+    def font(self, family: str, fallback: Optional[str] = None) -> Optional[str]:
+        """Returns the subset TTF built by tools/build_fonts.py for family, else fallback."""
+        entry = self.fonts.get(family)
+        return entry["ttf"] if entry else fallback
+
+
+def _read_manifest(path: Path) -> dict:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != MANIFEST_FORMAT:
+        return {}
+    return data
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+import flet as ft
+
+DEFAULT_CAPACITY = 12
+
+
+class AudioPool:
+    """A per-session LRU of ft.Audio players kept in page.overlay, keyed by src.
+
+    A player that stays in the pool keeps its decoded clip on the client, so
+    returning to a step it belongs to replays without another fetch. The
+    active player is never evicted.
+    """
+
+    def __init__(
+        self,
+        page: ft.Page,
+        capacity: int = DEFAULT_CAPACITY,
+        volume: float = 0.9,
+        balance: float = 0.0,
+        **handlers: Callable,
+    ):
+        if capacity < 1:
+            raise ValueError("AudioPool capacity must be at least 1")
+        self.page = page
+        self.capacity = capacity
+        self.volume = volume
+        self.balance = balance
+        # Event handlers (on_state_changed=..., etc.) attached to every player.
+        self.handlers = handlers
+        self.active: Optional[ft.Audio] = None
+        self._players: "OrderedDict[str, ft.Audio]" = OrderedDict()
+        self._overlay_changed = False
+
+    def __contains__(self, src: str) -> bool:
+        return src in self._players
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def get(self, src: str) -> ft.Audio:
+        """Returns the player for src, creating it if needed, and marks it most recently used."""
+        player = self._players.get(src)
+        if player is None:
+            player = ft.Audio(src=src, volume=self.volume, balance=self.balance, autoplay=False, **self.handlers)
+            self._players[src] = player
+            self.page.overlay.append(player)
+            self._overlay_changed = True
+        else:
+            self._players.move_to_end(src)
+        self._evict(keep=player)
+        return player
+
+    def activate(self, src: str, playback_rate: float, release_mode: ft.audio.ReleaseMode) -> ft.Audio:
+        """Makes the player for src the active one, carrying over speed and loop settings."""
+        self.active = self.get(src)
+        self.active.playback_rate = playback_rate
+        self.active.release_mode = release_mode
+        return self.active
+
+    def prefetch(self, srcs: Iterable[str]):
+        """Warms players for srcs, given from least to most important. Only the
+        most important ones that fit in the pool are loaded."""
+        ordered = list(dict.fromkeys(reversed(list(srcs))))[: self.capacity - 1]
+        for src in reversed(ordered):
+            self.get(src)
+        if self.active is not None:
+            self._players.move_to_end(self.active.src)
+
+    def take_overlay_changed(self) -> bool:
+        """Reports whether players were added or evicted since the last call."""
+        changed, self._overlay_changed = self._overlay_changed, False
+        return changed
+
+    def _evict(self, keep: ft.Audio):
+        while len(self._players) > self.capacity:
+            for src, player in self._players.items():
+                if player is not self.active and player is not keep:
+                    del self._players[src]
+                    self.page.overlay.remove(player)
+                    self._overlay_changed = True
+                    break
+            else:
+                return
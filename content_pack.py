@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import marshal
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+PACK_FORMAT = 1
+SNAPSHOT_FORMAT = 3
+ASSET_ROOT = Path(__file__).resolve().parent
+CONTENT_DIR = ASSET_ROOT / "content"
+CACHE_DIR = Path(os.environ.get("FIRST_PILLAR_CACHE_DIR", Path(__file__).resolve().parent / ".cache" / "content"))
+
+STEP_FIELDS = ("title", "description")
+PHRASE_FIELDS = ("arabic", "transliteration", "translation")
+ASSET_FIELDS = ("image", "audio")
+CLIP_FIELDS = ("audio_start_ms", "audio_end_ms")
+GUIDE_FIELDS = ("key", "name", "subtitle")
+
+
+class ContentPackError(ValueError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class Phrase:
+    arabic: str
+    transliteration: str
+    translation: str
+
+
+@dataclass(frozen=True, slots=True)
+class GuideStep:
+    title: str
+    description: str
+    phrase: Phrase
+    image: str
+    audio: str
+    # The step's slice of the audio file; several steps may share one long recording.
+    audio_start_ms: int = 0
+    audio_end_ms: Optional[int] = None
+
+    @property
+    def arabic(self) -> str:
+        return self.phrase.arabic
+
+    @property
+    def transliteration(self) -> str:
+        return self.phrase.transliteration
+
+    @property
+    def translation(self) -> str:
+        return self.phrase.translation
+
+
+class LazySteps(Sequence[GuideStep]):
+    """Tuple-backed step list that is only decoded on first access."""
+
+    __slots__ = ("_loader", "_steps")
+
+    def __init__(self, loader: Callable[[], Tuple[GuideStep, ...]]):
+        self._loader: Optional[Callable[[], Tuple[GuideStep, ...]]] = loader
+        self._steps: Optional[Tuple[GuideStep, ...]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._steps is not None
+
+    def _load(self) -> Tuple[GuideStep, ...]:
+        if self._steps is None:
+            assert self._loader is not None
+            self._steps = self._loader()
+            self._loader = None
+        return self._steps
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __iter__(self) -> Iterator[GuideStep]:
+        return iter(self._load())
+
+    def __repr__(self) -> str:
+        return f"LazySteps({self._steps!r})" if self.loaded else "LazySteps(<not loaded>)"
+
+
+@dataclass(frozen=True, slots=True)
+class Guide:
+    key: str
+    name: str
+    subtitle: str
+    steps: Sequence[GuideStep]
+
+
+@dataclass(frozen=True)
+class ContentPack:
+    version: str
+    info_md: str
+    guides: Tuple[Guide, ...]
+    guides_by_key: Mapping[str, Guide]
+    # Every distinct asset file once, under its canonical path.
+    assets: Tuple[str, ...]
+
+
+def _require_str(data: dict, field: str, where: str) -> str:
+    value = data.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ContentPackError(f"{where}: '{field}' must be a non-empty string")
+    return value
+
+
+def _read_json(path: Path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise ContentPackError(f"{path.name}: file is missing") from None
+    except json.JSONDecodeError as e:
+        raise ContentPackError(f"{path.name}: invalid JSON ({e})") from None
+
+
+class _Interner:
+    """Assigns one index per distinct value; the snapshot stores each value once."""
+
+    def __init__(self):
+        self.values: List = []
+        self._index: Dict = {}
+
+    def add(self, value) -> int:
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+class _AssetStore:
+    """Content-addressed asset registry: files with identical bytes share the
+    first path seen, so every step points at the same URL for them."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.paths = _Interner()
+        self.stats: Dict[str, Tuple[int, int]] = {}
+        self._by_digest: Dict[str, int] = {}
+        self._by_path: Dict[str, int] = {}
+
+    def add(self, path: str, where: str) -> int:
+        index = self._by_path.get(path)
+        if index is not None:
+            return index
+        file = self.root / path
+        try:
+            data = file.read_bytes()
+            stat = file.stat()
+        except OSError:
+            raise ContentPackError(f"{where}: asset '{path}' does not exist") from None
+        self.stats[path] = (stat.st_size, stat.st_mtime_ns)
+        digest = hashlib.sha256(data).hexdigest()
+        index = self._by_digest.get(digest)
+        if index is None:
+            index = self._by_digest[digest] = self.paths.add(path)
+        self._by_path[path] = index
+        return index
+
+
+def _parse_phrase(data: dict, where: str) -> Tuple[str, str, str]:
+    return tuple(_require_str(data, field, where) for field in PHRASE_FIELDS)
+
+
+def _parse_clip(data: dict, where: str) -> Tuple[int, Optional[int]]:
+    start, end = (data.get(field) for field in CLIP_FIELDS)
+    for field, value in zip(CLIP_FIELDS, (start, end)):
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+            raise ContentPackError(f"{where}: '{field}' must be a non-negative number of milliseconds")
+    start = start or 0
+    if end is not None and end <= start:
+        raise ContentPackError(f"{where}: 'audio_end_ms' must be after 'audio_start_ms'")
+    return start, end
+
+
+def _parse_guide(
+    path: Path,
+    expected_key: str,
+    named_phrases: Mapping[str, Tuple[str, str, str]],
+    phrases: _Interner,
+    assets: _AssetStore,
+) -> Tuple[Tuple[str, str, str], Tuple[Tuple, ...]]:
+    data = _read_json(path)
+    where = f"guides/{path.name}"
+    if not isinstance(data, dict):
+        raise ContentPackError(f"{where}: expected an object")
+    header = tuple(_require_str(data, field, where) for field in GUIDE_FIELDS)
+    if header[0] != expected_key:
+        raise ContentPackError(f"{where}: key '{header[0]}' does not match manifest entry '{expected_key}'")
+    raw_steps = data.get("steps")
+    if not isinstance(raw_steps, list) or not raw_steps:
+        raise ContentPackError(f"{where}: 'steps' must be a non-empty list")
+    steps = []
+    for n, raw in enumerate(raw_steps, start=1):
+        step_where = f"{where} step {n}"
+        if not isinstance(raw, dict):
+            raise ContentPackError(f"{step_where}: must be an object")
+        if "phrase" in raw:
+            phrase_id = raw["phrase"]
+            if phrase_id not in named_phrases:
+                raise ContentPackError(f"{step_where}: unknown phrase '{phrase_id}'")
+            phrase = named_phrases[phrase_id]
+        else:
+            phrase = _parse_phrase(raw, step_where)
+        steps.append(
+            tuple(_require_str(raw, field, step_where) for field in STEP_FIELDS)
+            + (phrases.add(phrase),)
+            + tuple(assets.add(_require_str(raw, field, step_where), step_where) for field in ASSET_FIELDS)
+            + _parse_clip(raw, step_where)
+        )
+    return header, tuple(steps)
+
+
+def _parse_phrases(path: Path) -> Dict[str, Tuple[str, str, str]]:
+    data = _read_json(path)
+    if not isinstance(data, dict):
+        raise ContentPackError(f"{path.name}: expected an object of phrase ids")
+    return {
+        phrase_id: _parse_phrase(raw if isinstance(raw, dict) else {}, f"{path.name} '{phrase_id}'")
+        for phrase_id, raw in data.items()
+    }
+
+
+def _pack_files(content_dir: Path) -> List[Path]:
+    return sorted(p for p in content_dir.rglob("*") if p.is_file() and p.suffix in (".json", ".md"))
+
+
+def content_hash(content_dir: Path = CONTENT_DIR) -> str:
+    digest = hashlib.sha256(f"pack-format:{PACK_FORMAT}:{SNAPSHOT_FORMAT}".encode())
+    for path in _pack_files(content_dir):
+        digest.update(path.relative_to(content_dir).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def compile_content_pack(content_dir: Path = CONTENT_DIR, asset_root: Path = ASSET_ROOT) -> Dict[str, object]:
+    """Reads and validates the pack into the snapshot layout stored in the cache."""
+    manifest = _read_json(content_dir / "manifest.json")
+    if not isinstance(manifest, dict) or manifest.get("version") != PACK_FORMAT:
+        raise ContentPackError(f"manifest.json: expected 'version': {PACK_FORMAT}")
+    keys = manifest.get("guides")
+    if not isinstance(keys, list) or not keys or not all(isinstance(k, str) for k in keys):
+        raise ContentPackError("manifest.json: 'guides' must be a non-empty list of guide keys")
+    if len(set(keys)) != len(keys):
+        raise ContentPackError("manifest.json: duplicate guide keys")
+    info_name = _require_str(manifest, "info", "manifest.json")
+    try:
+        info_md = (content_dir / info_name).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        raise ContentPackError(f"{info_name}: file is missing") from None
+
+    phrases_name = manifest.get("phrases")
+    named_phrases = _parse_phrases(content_dir / phrases_name) if phrases_name else {}
+
+    phrases = _Interner()
+    assets = _AssetStore(asset_root)
+    headers = []
+    steps = {}
+    for key in keys:
+        header, guide_steps = _parse_guide(content_dir / "guides" / f"{key}.json", key, named_phrases, phrases, assets)
+        headers.append(header)
+        steps[key] = marshal.dumps(guide_steps)
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "info_md": info_md,
+        "guides": headers,
+        "steps": steps,
+        "phrases": phrases.values,
+        "assets": assets.paths.values,
+        "asset_stats": assets.stats,
+    }
+
+
+def _read_snapshot(path: Path, asset_root: Path) -> Optional[Dict[str, object]]:
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+        return None
+    # Asset deduplication depends on file contents, so a changed asset invalidates the snapshot.
+    for asset, expected in snapshot["asset_stats"].items():
+        try:
+            stat = (asset_root / asset).stat()
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != expected:
+            return None
+    return snapshot
+
+
+def _write_snapshot(path: Path, snapshot: Dict[str, object]):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        for stale in path.parent.glob("*.pack"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+    except OSError:
+        # A read-only checkout still works, it just recompiles on every start.
+        pass
+
+
+def _steps_loader(
+    blob: bytes, phrases: Tuple[Phrase, ...], assets: Tuple[str, ...]
+) -> Callable[[], Tuple[GuideStep, ...]]:
+    def load() -> Tuple[GuideStep, ...]:
+        return tuple(
+            GuideStep(title, description, phrases[phrase], assets[image], assets[audio], start, end)
+            for title, description, phrase, image, audio, start, end in marshal.loads(blob)
+        )
+
+    return load
+
+
+def load_content_pack(
+    content_dir: Path = CONTENT_DIR, cache_dir: Optional[Path] = CACHE_DIR, asset_root: Path = ASSET_ROOT
+) -> ContentPack:
+    version = content_hash(content_dir)
+    snapshot = None
+    cache_path = Path(cache_dir) / f"{version}.pack" if cache_dir is not None else None
+    if cache_path is not None:
+        snapshot = _read_snapshot(cache_path, asset_root)
+    if snapshot is None:
+        snapshot = compile_content_pack(content_dir, asset_root)
+        if cache_path is not None:
+            _write_snapshot(cache_path, snapshot)
+
+    phrases = tuple(Phrase(*fields) for fields in snapshot["phrases"])
+    assets = tuple(snapshot["assets"])
+    step_blobs = snapshot["steps"]
+    guides = tuple(
+        Guide(key=key, name=name, subtitle=subtitle, steps=LazySteps(_steps_loader(step_blobs[key], phrases, assets)))
+        for key, name, subtitle in snapshot["guides"]
+    )
+    return ContentPack(
+        version=version,
+        info_md=snapshot["info_md"],
+        guides=guides,
+        guides_by_key=MappingProxyType({guide.key: guide for guide in guides}),
+        assets=assets,
+    )
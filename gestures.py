@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Optional
+
+
+class SwipeNavigator:
+    """Turns horizontal flings into step changes.
+
+    * Flings slower than min_velocity are dropped before any work is done.
+    * Faster flings move further: one step at min_velocity, plus one for
+      every extra velocity_per_step, up to max_steps.
+    * The first fling commits at once. Flings that follow within
+      debounce_seconds only move a pending target, and that target is
+      committed once when the burst settles. A fast flick through a guide
+      costs one render and one audio swap at the end, not one per flick.
+
+    commit(index) is called with the unclamped target index; the caller is
+    expected to clamp it to the guide.
+    """
+
+    def __init__(
+        self,
+        commit: Callable[[int], None],
+        min_velocity: float = 300,
+        velocity_per_step: float = 1500,
+        max_steps: int = 4,
+        debounce_seconds: float = 0.25,
+    ):
+        self.commit = commit
+        self.min_velocity = min_velocity
+        self.velocity_per_step = velocity_per_step
+        self.max_steps = max_steps
+        self.debounce_seconds = debounce_seconds
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._target: Optional[int] = None
+        self._pending = False
+
+    def steps_for(self, velocity_x: float) -> int:
+        """Signed step delta for a fling; swiping left (negative velocity) moves forward."""
+        speed = abs(velocity_x)
+        if speed < self.min_velocity:
+            return 0
+        steps = min(self.max_steps, 1 + int((speed - self.min_velocity) // self.velocity_per_step))
+        return steps if velocity_x < 0 else -steps
+
+    def fling(self, velocity_x: float, current_index: int, last_index: int):
+        delta = self.steps_for(velocity_x)
+        if delta == 0:
+            return
+        with self._lock:
+            leading = self._timer is None
+            base = current_index if leading else self._target
+            self._target = max(0, min(last_index, base + delta))
+            if not leading:
+                self._timer.cancel()
+            self._pending = not leading
+            self._timer = threading.Timer(self.debounce_seconds, self._settle)
+            self._timer.args = (self._timer,)
+            self._timer.daemon = True
+            self._timer.start()
+            target = self._target
+        if leading:
+            self.commit(target)
+
+    def cancel(self):
+        """Forgets any burst in progress, e.g. when the guide changes."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = None
+            self._target = None
+            self._pending = False
+
+    def _settle(self, timer: threading.Timer):
+        with self._lock:
+            if timer is not self._timer:
+                # A newer fling restarted the window after this timer fired.
+                return
+            target = self._target if self._pending else None
+            self._timer = None
+            self._target = None
+            self._pending = False
+        if target is not None:
+            self.commit(target)
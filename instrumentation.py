@@ -0,0 +1,227 @@
+"""Opt-in timing for GuideApp event handlers and page updates.
+
+Set ``FIRST_PILLAR_METRICS_PORT`` to serve Prometheus text on
+``http://127.0.0.1:<port>/metrics``, and/or ``FIRST_PILLAR_TRACE`` to a file
+path to get a Chrome trace (chrome://tracing, Perfetto) written at exit. With
+neither set, every hook is a plain pass-through.
+"""
+from __future__ import annotations
+
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional, Tuple
+
+from flet.core.protocol import CommandEncoder
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BYTES_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144)
+CONTROLS_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250)
+TRACE_LIMIT = 200_000
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> List[str]:
+        sep = "," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.sum}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class Metrics:
+    """Process-wide registry shared by every session."""
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_path: Optional[str] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._handlers: Dict[str, Histogram] = defaultdict(lambda: Histogram(SECONDS_BUCKETS))
+        self._update_seconds = Histogram(SECONDS_BUCKETS)
+        self._update_bytes = Histogram(BYTES_BUCKETS)
+        self._update_controls = Histogram(CONTROLS_BUCKETS)
+        self._trace: Deque[dict] = deque(maxlen=TRACE_LIMIT)
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def configure(self, port: Optional[int] = None, trace_path: Optional[str] = None):
+        self.enabled = bool(port or trace_path)
+        self.trace_path = trace_path
+        if port and self._server is None:
+            self._server = serve_metrics(self, port)
+        if trace_path:
+            atexit.register(self.write_trace)
+
+    def observe_handler(self, name: str, started: float, elapsed: float):
+        with self._lock:
+            self._handlers[name].observe(elapsed)
+        self._add_trace(name, "handler", started, elapsed, {})
+
+    def observe_payload(self, controls: int, size: int):
+        # Called from the connection while an update is in flight on this thread.
+        self._local.payload = (controls, size)
+
+    def observe_update(self, started: float, elapsed: float):
+        controls, size = getattr(self._local, "payload", (0, 0))
+        self._local.payload = (0, 0)
+        with self._lock:
+            self._update_seconds.observe(elapsed)
+            self._update_bytes.observe(size)
+            self._update_controls.observe(controls)
+        self._add_trace("update", "update", started, elapsed, {"controls": controls, "bytes": size})
+
+    def _add_trace(self, name: str, category: str, started: float, elapsed: float, args: dict):
+        if self.trace_path:
+            self._trace.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": round(started * 1e6, 1),
+                    "dur": round(elapsed * 1e6, 1),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP first_pillar_handler_seconds Wall time of GuideApp event handlers.",
+            "# TYPE first_pillar_handler_seconds histogram",
+        ]
+        with self._lock:
+            for name, histogram in sorted(self._handlers.items()):
+                lines += histogram.render("first_pillar_handler_seconds", f'handler="{name}"')
+            for metric, help_text, histogram in (
+                ("first_pillar_update_seconds", "Wall time of page/control update() calls.", self._update_seconds),
+                ("first_pillar_update_bytes", "Encoded payload size of each update.", self._update_bytes),
+                ("first_pillar_update_controls", "Controls serialized per update.", self._update_controls),
+            ):
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                lines += histogram.render(metric, "")
+        return "\n".join(lines) + "\n"
+
+    def write_trace(self, path: Optional[str] = None):
+        path = path or self.trace_path
+        if not path:
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": list(self._trace), "displayTimeUnit": "ms"}, f)
+
+
+METRICS = Metrics()
+
+
+def serve_metrics(metrics: Metrics, port: int) -> ThreadingHTTPServer:
+    # Imported here: most workers never serve metrics, and it slows their start.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+def instrumented(handler: Callable) -> Callable:
+    """Records the wall time of a GuideApp handler when metrics are enabled."""
+    name = handler.__name__
+
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not METRICS.enabled:
+            return handler(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            METRICS.observe_handler(name, started, time.perf_counter() - started)
+
+    return wrapper
+
+
+def count_controls(commands) -> int:
+    # "add" carries the whole new subtree as sub-commands; "set" patches one control.
+    return sum((1 if c.values else 0) + len(c.commands) if c.name == "add" else 1 for c in commands if c.name in ("add", "set"))
+
+
+def instrument_page(page, metrics: Metrics = METRICS):
+    """Times every update() on page and measures what it puts on the wire.
+
+    Control.update() goes through page.update(), so wrapping the page
+    instance covers both. The payload is measured on the page's connection.
+    """
+    if not metrics.enabled:
+        return
+    update = page.update
+
+    def timed_update(*controls):
+        started = time.perf_counter()
+        try:
+            update(*controls)
+        finally:
+            metrics.observe_update(started, time.perf_counter() - started)
+
+    page.update = timed_update
+
+    # The connection is shared by every session in the process; wrap it once.
+    conn = getattr(page, "_Page__conn", None)
+    if conn is None or getattr(conn, "_first_pillar_instrumented", False):
+        return
+    conn._first_pillar_instrumented = True
+    send_commands = conn.send_commands
+
+    def measured_send_commands(session_id, commands):
+        size = len(json.dumps(commands, cls=CommandEncoder, separators=(",", ":")))
+        metrics.observe_payload(count_controls(commands), size)
+        return send_commands(session_id, commands)
+
+    conn.send_commands = measured_send_commands
+
+
+def configure_from_env():
+    port = os.environ.get("FIRST_PILLAR_METRICS_PORT")
+    METRICS.configure(port=int(port) if port else None, trace_path=os.environ.get("FIRST_PILLAR_TRACE") or None)
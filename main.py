@@ -1,283 +1,175 @@
 from __future__ import annotations
 
+import functools
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import List
+from typing import Callable, Dict, List, Mapping, Sequence, Tuple
 
 import flet as ft
 from flet import Colors, Icons
 
+from asset_manifest import AssetManifest
+from audio_pool import DEFAULT_CAPACITY, AudioPool
+from content_pack import Guide, GuideStep, load_content_pack
+from gestures import SwipeNavigator
+from instrumentation import configure_from_env, instrument_page, instrumented
+from playback import AudioState, Playback
+from session_state import SessionState, SessionStore
+
 
 SOFT_GOLD = "#c29a3d"
 INK_BLACK = "#000000"
 CLOUD_WHITE = "#fdfbf5"
 SOFT_GRAY = "#e8e6df"
 
-
-@dataclass
-class GuideStep:
+STEP_IMAGE_HEIGHT = 260
+MOBILE_AUDIO_KBPS = 64
+SPEEDS = ("0.5", "0.75", "1.0", "1.25")
+STEP_VIEW_CACHE_SIZE = 512
+# Pooled players remember where they were last cued in Audio.data. None is a
+# fresh player, still at 0; UNCUED one that has played since.
+UNCUED = -1
+
+ARABIC_FONT = "NotoNaskhArabic"
+# Used until tools/build_fonts.py has produced self-hosted subsets.
+FALLBACK_FONTS = {
+    "Poppins": "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Regular.ttf",
+    "PoppinsBold": "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Bold.ttf",
+}
+
+
+# Guides, steps and the Info markdown live in content/ and are loaded through a
+# cached snapshot; step details are decoded when a guide is first selected.
+CONTENT_PACK = load_content_pack()
+GUIDES: Tuple[Guide, ...] = CONTENT_PACK.guides
+GUIDES_BY_KEY: Mapping[str, Guide] = CONTENT_PACK.guides_by_key
+INFO_MD = CONTENT_PACK.info_md
+
+configure_from_env()
+
+# Resolves content asset paths to the hashed variants built by tools/build_assets.py.
+ASSETS = AssetManifest.load()
+
+# Markdown options for the Info tab. The text itself comes from the compiled
+# content pack, so every session reuses the same string.
+INFO_MARKDOWN = dict(
+    value=INFO_MD,
+    selectable=True,
+    extension_set=ft.MarkdownExtensionSet.GITHUB_WEB,
+    code_theme="atom-one-light",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class StepView:
+    """Everything the step detail shows for one step, resolved once and
+    shared read-only by every session."""
+
+    image_src: str
     title: str
     description: str
     arabic: str
     transliteration: str
     translation: str
-    image: str
-    audio: str
-
-
-@dataclass
-class Guide:
-    key: str
-    name: str
-    subtitle: str
-    steps: List[GuideStep]
-
-
-def build_guides() -> List[Guide]:
-    placeholder_audio = "assets/audio/placeholder.mp3"
-
-    def place_img(label: str) -> str:
-        return "assets/images/placeholder.png"
-
-    return [
-        Guide(
-            key="wudu",
-            name="Wudu (Ablution)",
-            subtitle="Purification before every salah",
-            steps=[
-                GuideStep(
-                    title="Intention & Bismillah",
-                    description="Hold the intention for purification and begin with Bismillah.",
-                    arabic="بِسْمِ اللّٰهِ",
-                    transliteration="Bismillāh",
-                    translation="In the name of Allah",
-                    image=place_img("Wudu Step 1"),
-                    audio=placeholder_audio,
-                ),
-                GuideStep(
-                    title="Wash face & arms",
-                    description="Gently wash the face and forearms up to the elbows three times.",
-                    arabic="اللَّهُمَّ اجْعَلْنِي مِنَ التَّوَّابِينَ",
-                    transliteration="Allāhumma-jʿalnī mina-t-tawwābīn",
-                    translation="O Allah, make me among those who repent",
-                    image=place_img("Wudu Step 2"),
-                    audio=placeholder_audio,
-                ),
-                GuideStep(
-                    title="Wipe head & wash feet",
-                    description="Pass wet hands over the head once, then wash the feet to the ankles.",
-                    arabic="وَاجْعَلْنِي مِنَ الْمُتَطَهِّرِينَ",
-                    transliteration="Wajʿalnī mina-l-mutaṭahhirīn",
-                    translation="and make me among the purified",
-                    image=place_img("Wudu Step 3"),
-                    audio=placeholder_audio,
-                ),
-            ],
-        ),
-        Guide(
-            key="fajr",
-            name="Fajr",
-            subtitle="Dawn prayer · 2 units",
-            steps=[
-                GuideStep(
-                    title="Opening Takbir",
-                    description="Raise the hands and softly say the opening takbir.",
-                    arabic="اللَّهُ أَكْبَر",
-                    transliteration="Allāhu akbar",
-                    translation="Allah is the Greatest",
-                    image=place_img("Fajr Step 1"),
-                    audio=placeholder_audio,
-                ),
-                GuideStep(
-                    title="Recitation",
-                    description="Recite Surah Al-Fatiha and a short surah with presence of heart.",
-                    arabic="الْحَمْدُ لِلّٰهِ رَبِّ الْعَالَمِينَ",
-                    transliteration="Al-ḥamdu lillāhi rabbil-'ālamīn",
-                    translation="All praise is for Allah, Lord of the worlds",
-                    image=place_img("Fajr Step 2"),
-                    audio=placeholder_audio,
-                ),
-                GuideStep(
-                    title="Ruku & Sujud",
-                    description="Bow with hands on knees, then prostrate with humility.",
-                    arabic="سُبْحَانَ رَبِّيَ الْعَظِيم",
-                    transliteration="Subḥāna rabbiyal-ʿaẓīm",
-                    translation="Glory be to my Lord, the Magnificent",
-                    image=place_img("Fajr Step 3"),
-                    audio=placeholder_audio,
-                ),
-            ],
-        ),
-        Guide(
-            key="dhuhr",
-            name="Dhuhr",
-            subtitle="Midday prayer · 4 units",
-            steps=[
-                GuideStep(
-                    title="Quiet recitation",
-                    description="Recite silently while focusing on the meanings.",
-                    arabic="إِيَّاكَ نَعْبُدُ وَإِيَّاكَ نَسْتَعِين",
-                    transliteration="Iyyāka naʿbudu wa-iyyāka nastaʿīn",
-                    translation="You alone we worship, and You alone we ask for help",
-                    image=place_img("Dhuhr Step 1"),
-                    audio=placeholder_audio,
-                ),
-                GuideStep(
-                    title="Qiyam to Ruku",
-                    description="Stand with calm composure, then move into ruku when ready.",
-                    arabic="سَمِعَ اللّٰهُ لِمَنْ حَمِدَه",
-                    transliteration="Samiʿa llāhu liman ḥamidah",
-                    translation="Allah hears those who praise Him",
-                    image=place_img("Dhuhr Step 2"),
-                    audio=placeholder_audio,
-                ),
-                GuideStep(
-                    title="Tashahhud",
-                    description="Sit peacefully and recite the tashahhud before salām.",
-                    arabic="التَّحِيَّاتُ لِلّٰهِ",
-                    transliteration="At-taḥiyyātu lillāh",
-                    translation="All greetings belong to Allah",
-                    image=place_img("Dhuhr Step 3"),
-                    audio=placeholder_audio,
-                ),
-            ],
-        ),
-        Guide(
-            key="asr",
-            name="Asr",
-            subtitle="Afternoon prayer · 4 units",
-            steps=[
-                GuideStep(
-                    title="Centering breath",
-                    description="Pause briefly, breathe, and enter the prayer with focus.",
-                    arabic="اللَّهُ أَكْبَر",
-                    transliteration="Allāhu akbar",
-                    translation="Allah is the Greatest",
-                    image=place_img("Asr Step 1"),
-                    audio=placeholder_audio,
-                ),
-                GuideStep(
-                    title="Measured bow",
-                    description="Keep the back level in ruku and gaze softly at the place of sujud.",
-                    arabic="سُبْحَانَ رَبِّيَ الْعَظِيم",
-                    transliteration="Subḥāna rabbiyal-ʿaẓīm",
-                    translation="Glory be to my Lord, the Magnificent",
-                    image=place_img("Asr Step 2"),
-                    audio=placeholder_audio,
-                ),
-                GuideStep(
-                    title="Grateful prostration",
-                    description="In sujud, whisper gratitude and supplication.",
-                    arabic="سُبْحَانَ رَبِّيَ الأَعْلَى",
-                    transliteration="Subḥāna rabbiyal-aʿlā",
-                    translation="Glory be to my Lord, the Most High",
-                    image=place_img("Asr Step 3"),
-                    audio=placeholder_audio,
-                ),
-            ],
-        ),
-        Guide(
-            key="maghrib",
-            name="Maghrib",
-            subtitle="Sunset prayer · 3 units",
-            steps=[
-                GuideStep(
-                    title="Opening gratitude",
-                    description="Begin with awareness of the day that just passed.",
-                    arabic="رَبَّنَا تَقَبَّلْ مِنَّا",
-                    transliteration="Rabbana taqabbal minnā",
-                    translation="Our Lord, accept this from us",
-                    image=place_img("Maghrib Step 1"),
-                    audio=placeholder_audio,
-                ),
-                GuideStep(
-                    title="Balanced pace",
-                    description="Recite audibly yet softly in the first two rakʿat.",
-                    arabic="وَلَا الضَّالِّينَ",
-                    transliteration="Walā ḍ-ḍāllīn",
-                    translation="and not of those who are astray",
-                    image=place_img("Maghrib Step 2"),
-                    audio=placeholder_audio,
-                ),
-                GuideStep(
-                    title="Closing salām",
-                    description="Turn the head right and left, offering salām to the angels.",
-                    arabic="السَّلَامُ عَلَيْكُمْ وَرَحْمَةُ اللّٰهِ",
-                    transliteration="As-salāmu ʿalaykum wa raḥmatullāh",
-                    translation="Peace and mercy of Allah be upon you",
-                    image=place_img("Maghrib Step 3"),
-                    audio=placeholder_audio,
-                ),
-            ],
-        ),
-        Guide(
-            key="isha",
-            name="Isha",
-            subtitle="Night prayer · 4 units",
-            steps=[
-                GuideStep(
-                    title="Deep focus",
-                    description="Let the stillness of the night enhance intention.",
-                    arabic="قُلْ هُوَ اللّٰهُ أَحَد",
-                    transliteration="Qul huwa llāhu aḥad",
-                    translation="Say: He is Allah, One",
-                    image=place_img("Isha Step 1"),
-                    audio=placeholder_audio,
-                ),
-                GuideStep(
-                    title="Tranquil sujud",
-                    description="Stay a little longer in sujud to reflect on Allah's mercy.",
-                    arabic="رَبِّ اغْفِرْ لِي",
-                    transliteration="Rabbi-ghfir lī",
-                    translation="My Lord, forgive me",
-                    image=place_img("Isha Step 2"),
-                    audio=placeholder_audio,
-                ),
-                GuideStep(
-                    title="Witr reminder",
-                    description="After Isha, consider praying Witr to seal the night.",
-                    arabic="اللَّهُمَّ أَنْتَ السَّلَام",
-                    transliteration="Allāhumma anta s-salām",
-                    translation="O Allah, You are Peace",
-                    image=place_img("Isha Step 3"),
-                    audio=placeholder_audio,
-                ),
-            ],
-        ),
-    ]
+    counter: str
+    is_first: bool
+    is_last: bool
+
+
+@functools.lru_cache(maxsize=STEP_VIEW_CACHE_SIZE)
+def step_view(pack_version: str, guide_key: str, step_index: int) -> StepView:
+    """The StepView for a step of the loaded content pack. pack_version is
+    part of the key, so views from an older pack are never served."""
+    guide = GUIDES_BY_KEY[guide_key]
+    step = guide.steps[step_index]
+    total_steps = len(guide.steps)
+    return StepView(
+        image_src=ASSETS.image(step.image, height=STEP_IMAGE_HEIGHT),
+        title=step.title,
+        description=step.description,
+        arabic=step.arabic,
+        transliteration=step.transliteration,
+        translation=step.translation,
+        counter=f"Step {step_index + 1} of {total_steps}",
+        is_first=step_index == 0,
+        is_last=step_index == total_steps - 1,
+    )
+
+
+def invalidate_step_views():
+    """Drops every cached StepView; call after reloading the content pack or the asset manifest."""
+    step_view.cache_clear()
+
+
+def build_info_view() -> ft.Container:
+    return ft.Container(
+        padding=ft.padding.all(20),
+        bgcolor=Colors.WHITE,
+        border_radius=18,
+        content=ft.Markdown(**INFO_MARKDOWN),
+    )
 
 
-INFO_MD = """
-# Foundations to Remember
+def build_tab_skeleton() -> ft.Control:
+    return ft.Column(
+        spacing=16,
+        controls=[ft.Container(height=height, bgcolor=SOFT_GRAY, border_radius=12) for height in (28, 16, 160)],
+    )
 
-## Five Pillars of Islam
-1. **Shahada** – Declaring that none is worthy of worship except Allah and that Muhammad ﷺ is His Messenger.
-2. **Salah** – Performing the five daily prayers with presence, beginning with Fajr and ending with Isha.
-3. **Zakah** – Offering a portion of one's wealth to uplift those in need.
-4. **Sawm** – Fasting the month of Ramadan as an act of discipline and compassion.
-5. **Hajj** – Pilgrimage to Makkah once in a lifetime for those who are able.
 
-## Six Articles of Faith
-1. **Belief in Allah** – Acknowledging His oneness, mercy, and guidance.
-2. **Belief in Angels** – Recognizing the unseen creation that obeys Allah without hesitation.
-3. **Belief in Revealed Books** – Qur'an, Torah, Gospel, Psalms, and scriptures sent to humanity.
-4. **Belief in Messengers** – Including Adam, Nuh, Ibrahim, Musa, Isa, and Muhammad ﷺ.
-5. **Belief in the Last Day** – Accountability, justice, and eternal life.
-6. **Belief in Divine Decree** – Trusting Allah's perfect knowledge of all that was, is, and will be.
+class DeferredTab(ft.Tab):
+    """A tab that shows a skeleton until it is first selected, then builds its
+    body with factory and keeps it."""
 
-> *"Indeed, in the remembrance of Allah do hearts find rest."* – Qur'an 13:28
-"""
+    def __init__(self, text: str, factory: Callable[[], ft.Control]):
+        super().__init__(text=text, content=build_tab_skeleton())
+        self.factory = factory
+        self.built = False
+
+    def materialize(self) -> bool:
+        if self.built:
+            return False
+        self.content = self.factory()
+        self.built = True
+        return True
+
+
+def batched(handler: Callable) -> Callable:
+    """Runs a GuideApp handler inside batched_updates(), so everything it
+    changes reaches the client in a single message."""
+
+    @functools.wraps(handler)
+    def wrapper(self, *args, **kwargs):
+        with self.batched_updates():
+            return handler(self, *args, **kwargs)
+
+    return wrapper
 
 
 class GuideApp:
-    def __init__(self, page: ft.Page):
+    def __init__(self, page: ft.Page, audio_pool_size: int = DEFAULT_CAPACITY):
         self.page = page
-        self.guides = build_guides()
-        self.selected_guide = self.guides[0]
-        self.step_index = 0
-        self.is_playing = False
-
-        self.audio = ft.Audio(src=self.current_step.audio, volume=0.9, balance=0.0, autoplay=False)
-        self.page.overlay.append(self.audio)
+        self._update_batch = threading.local()
+        self.guides = GUIDES
+        # A reconnecting tab is restored before anything is built, so the first
+        # render already shows the guide and step it left off on.
+        self.session_store = SessionStore(page)
+        state = self.session_store.load({g.key: len(g.steps) for g in self.guides}, SPEEDS) or SessionState(self.guides[0].key)
+        self.selected_guide = GUIDES_BY_KEY[state.guide_key]
+        self.step_index = state.step_index
+        self.swipes = SwipeNavigator(self.go_to_step)
+        self.audio_kbps = MOBILE_AUDIO_KBPS if page.platform in (ft.PagePlatform.ANDROID, ft.PagePlatform.IOS) else None
+
+        self.audio_started = False
+        self.playback = Playback()
+        self.audio_pool = AudioPool(
+            page,
+            capacity=audio_pool_size,
+            on_state_changed=self.on_audio_state,
+            on_position_changed=self.on_audio_position,
+            on_duration_changed=self.on_audio_duration,
+        )
 
         self.play_button = ft.IconButton(
             icon=Icons.PLAY_CIRCLE,
@@ -287,32 +179,18 @@ class GuideApp:
             on_click=self.toggle_audio,
         )
         self.speed_selector = ft.Dropdown(
-            value="1.0",
+            value=state.speed,
             width=90,
             dense=True,
-            options=[
-                ft.dropdown.Option("0.5"),
-                ft.dropdown.Option("0.75"),
-                ft.dropdown.Option("1.0"),
-                ft.dropdown.Option("1.25"),
-            ],
+            options=[ft.dropdown.Option(speed) for speed in SPEEDS],
             on_change=self.change_speed,
         )
-        self.loop_switch = ft.Switch(label="Loop", value=False, on_change=self.toggle_loop)
+        self.loop_switch = ft.Switch(label="Loop", value=state.loop, on_change=self.toggle_loop)
+        self.progress_bar = ft.ProgressBar(value=0, color=SOFT_GOLD, bgcolor=SOFT_GRAY, bar_height=4, border_radius=2)
 
+        self.guide_cards: Dict[str, Tuple[ft.Container, ft.Container]] = {}
         self.prayers_view = ft.Column(spacing=28, expand=True)
-        self.info_view = ft.Container(
-            padding=ft.padding.all(20),
-            bgcolor=Colors.WHITE,
-            border_radius=18,
-            content=ft.Markdown(
-                INFO_MD,
-                selectable=True,
-                extension_set=ft.MarkdownExtensionSet.GITHUB_WEB,
-                code_theme="atom-one-light",
-            ),
-        )
-
+        self.prayers_tab = DeferredTab("Prayers", self.build_prayers_tab)
         self.tabs = ft.Tabs(
             animation_duration=350,
             indicator_color=SOFT_GOLD,
@@ -320,122 +198,338 @@ class GuideApp:
             label_color=INK_BLACK,
             unselected_label_color="#555555",
             tabs=[
-                ft.Tab(
-                    text="Prayers",
-                    content=ft.Container(padding=ft.padding.all(0), content=self.prayers_view),
-                ),
-                ft.Tab(text="Info", content=self.info_view),
+                self.prayers_tab,
+                # Most sessions never open Info, so its body waits for first selection.
+                DeferredTab("Info", build_info_view),
             ],
             expand=1,
+            on_change=self.on_tab_change,
         )
 
+        self.activate_audio()
+        self.audio_pool.take_overlay_changed()
+        self.tabs.tabs[self.tabs.selected_index].materialize()
         self.page.add(self.tabs)
-        self.render_prayers_view()
+        self.cue_clip()
+
+    @batched
+    def on_tab_change(self, *_):
+        tab = self.tabs.tabs[self.tabs.selected_index]
+        if tab.materialize():
+            self.push(tab)
+
+    @contextmanager
+    def batched_updates(self):
+        """Collects controls passed to push() and sends them in one page.update()
+        when the outermost batch on this thread ends."""
+        batch = self._update_batch
+        if getattr(batch, "dirty", None) is not None:
+            yield
+            return
+        batch.dirty = []
+        batch.after = []
+        try:
+            yield
+        finally:
+            dirty, batch.dirty = batch.dirty, None
+            after, batch.after = batch.after, None
+            self.send_updates(dirty)
+            for call in after:
+                call()
+
+    def after_updates(self, call: Callable[[], None]):
+        """Runs call once the current batch has been sent, e.g. an
+        invokeMethod that needs a control the batch adds."""
+        if getattr(self._update_batch, "dirty", None) is None:
+            call()
+        else:
+            self._update_batch.after.append(call)
+
+    def push(self, *controls: ft.Control):
+        dirty = getattr(self._update_batch, "dirty", None)
+        if dirty is None:
+            self.send_updates(controls)
+            return
+        for control in controls:
+            if not any(control is queued for queued in dirty):
+                dirty.append(control)
+
+    def send_updates(self, controls: Sequence[ft.Control]):
+        if not controls:
+            return
+        if any(control is self.page for control in controls):
+            self.page.update()
+        else:
+            self.page.update(*controls)
 
     @property
     def current_step(self) -> GuideStep:
         return self.selected_guide.steps[self.step_index]
 
+    @instrumented
+    @batched
     def select_guide(self, guide: Guide):
+        self.swipes.cancel()
         self.selected_guide = guide
         self.step_index = 0
         self.update_audio_source()
         self.render_prayers_view()
+        self.remember()
 
+    @instrumented
+    @batched
     def next_step(self, *_):
-        if self.step_index < len(self.selected_guide.steps) - 1:
-            self.step_index += 1
-            self.update_audio_source()
-            self.render_prayers_view()
+        self.go_to_step(self.step_index + 1)
 
+    @instrumented
+    @batched
     def previous_step(self, *_):
-        if self.step_index > 0:
-            self.step_index -= 1
+        self.go_to_step(self.step_index - 1)
+
+    @instrumented
+    @batched
+    def go_to_step(self, index: int):
+        index = max(0, min(len(self.selected_guide.steps) - 1, index))
+        if index != self.step_index:
+            self.step_index = index
             self.update_audio_source()
             self.render_prayers_view()
+            self.remember()
 
     def on_step_swipe(self, e: ft.DragEndEvent):
-        if e.velocity_x < -300:
-            self.next_step()
-        elif e.velocity_x > 300:
-            self.previous_step()
+        # Slow drags are dropped here, before any timing or batching work.
+        if e.velocity_x is None or abs(e.velocity_x) < self.swipes.min_velocity:
+            return
+        self.fling_step(e.velocity_x)
+
+    @instrumented
+    @batched
+    def fling_step(self, velocity_x: float):
+        self.swipes.fling(velocity_x, self.step_index, len(self.selected_guide.steps) - 1)
+
+    @property
+    def is_playing(self) -> bool:
+        return self.playback.playing
 
+    @instrumented
+    @batched
     def toggle_audio(self, *_):
         if not self.audio.src:
             return
         if self.is_playing:
             self.audio.pause()
-            self.play_button.icon = Icons.PLAY_CIRCLE
-            self.play_button.tooltip = "Play recitation"
+            self.playback.pause()
         else:
+            self.start_playback()
+        self.show_play_state()
+
+    def start_playback(self):
+        # The player may be new to the client, so it is told to play only
+        # once the update that adds it has been sent.
+        self.after_updates(self.audio.play)
+        self.audio.data = UNCUED
+        self.audio_started = True
+        self.playback.play()
+
+    def cue_clip(self):
+        """Seeks the active player to the start of the current step's slice,
+        unless it is known to be there already. Only the byte ranges around
+        that point are fetched, so a step in a long recording starts quickly."""
+        start = self.current_step.audio_start_ms
+        if (self.audio.data or 0) != start:
+            self.audio.data = start
+            self.after_updates(functools.partial(self.audio.seek, start))
+
+    @instrumented
+    @batched
+    def on_audio_state(self, e: ft.AudioStateChangeEvent):
+        # Pooled players other than the active one are paused and stay silent.
+        if e.control is not self.audio:
+            return
+        completed = e.state == AudioState.COMPLETED
+        if completed and self.release_mode == ft.audio.ReleaseMode.LOOP:
+            # The player loops the whole file by itself.
+            return
+        self.playback.on_state(e.state)
+        if completed:
+            self.finish_clip()
+        self.show_play_state()
+
+    @instrumented
+    @batched
+    def on_audio_position(self, e: ft.AudioPositionChangeEvent):
+        if e.control is not self.audio or not self.is_playing:
+            return
+        progress = self.playback.progress(e.position)
+        if self.playback.past_end():
+            # A slice ends before its file does, so the player is stopped here.
+            if not self.loop_switch.value:
+                self.audio.pause()
+                self.playback.on_state(AudioState.COMPLETED)
+            self.finish_clip()
+            self.show_play_state()
+        elif progress is not None:
+            self.show_progress(progress)
+
+    def finish_clip(self):
+        """The current step's audio has played to its end: start a looping
+        slice over, or move on to the next step and play that."""
+        if self.loop_switch.value:
+            self.audio.seek(self.current_step.audio_start_ms)
             self.audio.play()
-            self.play_button.icon = Icons.PAUSE_CIRCLE
-            self.play_button.tooltip = "Pause recitation"
-        self.is_playing = not self.is_playing
-        self.play_button.update()
+            self.playback.play()
+            self.playback.position_ms = self.current_step.audio_start_ms
+            self.show_progress(0.0)
+            return
+        self.audio.data = UNCUED
+        self.audio_started = False
+        self.show_progress(1.0)
+        if self.step_index < len(self.selected_guide.steps) - 1:
+            self.go_to_step(self.step_index + 1)
+            self.start_playback()
+
+    def on_audio_duration(self, e: ft.AudioDurationChangeEvent):
+        self.playback.on_duration(e.control.src, e.duration)
+
+    def show_play_state(self):
+        """Brings the play button in line with the playback state; sends
+        nothing when it already shows it."""
+        playing = self.is_playing
+        icon = Icons.PAUSE_CIRCLE if playing else Icons.PLAY_CIRCLE
+        if self.play_button.icon == icon:
+            return
+        self.play_button.icon = icon
+        self.play_button.tooltip = "Pause recitation" if playing else "Play recitation"
+        self.push(self.play_button)
+
+    def show_progress(self, value: float):
+        if self.progress_bar.value == value:
+            return
+        self.progress_bar.value = value
+        if self.prayers_tab.built:
+            self.push(self.progress_bar)
 
+    @instrumented
+    @batched
     def change_speed(self, e: ft.ControlEvent):
         try:
             rate = float(e.control.value)
         except (TypeError, ValueError):
             rate = 1.0
         self.audio.playback_rate = rate
-        self.audio.update()
+        self.push(self.audio)
+        self.remember()
 
+    @instrumented
+    @batched
     def toggle_loop(self, e: ft.ControlEvent):
-        self.audio.loop = bool(e.control.value)
-        self.audio.update()
+        self.audio.release_mode = self.release_mode
+        self.push(self.audio)
+        self.remember()
 
+    def remember(self):
+        self.session_store.save(
+            SessionState(self.selected_guide.key, self.step_index, self.speed_selector.value, bool(self.loop_switch.value))
+        )
+
+    @instrumented
+    @batched
     def reset_audio(self, *_):
+        start = self.current_step.audio_start_ms
         self.audio.pause()
-        self.audio.seek(0)
-        self.is_playing = False
-        self.play_button.icon = Icons.PLAY_CIRCLE
-        self.play_button.tooltip = "Play recitation"
-        self.play_button.update()
+        self.audio.seek(start)
+        self.audio.data = start
+        self.audio_started = False
+        self.playback.stop()
+        self.show_play_state()
+        self.show_progress(0.0)
 
     def update_audio_source(self):
-        self.audio.src = self.current_step.audio
-        self.audio.loop = self.loop_switch.value
-        self.audio.playback_rate = float(self.speed_selector.value)
-        self.audio.update()
-        self.is_playing = False
-        self.play_button.icon = Icons.PLAY_CIRCLE
-        self.play_button.tooltip = "Play recitation"
-        self.play_button.update()
+        if self.audio_started:
+            # Rewound by cue_clip() when this player is next used.
+            self.audio.pause()
+            self.audio_started = False
+        self.activate_audio()
+        if self.audio_pool.take_overlay_changed():
+            self.push(self.page)
+        else:
+            self.push(self.audio)
+        self.cue_clip()
+        self.show_play_state()
+        self.show_progress(0.0)
+
+    @property
+    def release_mode(self) -> ft.audio.ReleaseMode:
+        step = self.current_step
+        if step.audio_start_ms or step.audio_end_ms is not None:
+            # A slice of a longer file: looped by seeking back (finish_clip),
+            # and the file stays loaded for the steps that share it.
+            return ft.audio.ReleaseMode.STOP
+        return ft.audio.ReleaseMode.LOOP if self.loop_switch.value else ft.audio.ReleaseMode.RELEASE
+
+    def activate_audio(self):
+        """Switches to the pooled player for the current step and warms its
+        neighbours and the first step of every guide card, so the next swipe
+        or tap can start playing without waiting for a fresh fetch."""
+        self.audio = self.audio_pool.activate(
+            self.audio_src(self.current_step),
+            playback_rate=float(self.speed_selector.value),
+            release_mode=self.release_mode,
+        )
+        step = self.current_step
+        self.playback.switch(self.audio.src, step.audio_start_ms, step.audio_end_ms)
+        steps = self.selected_guide.steps
+        neighbours = [self.audio_src(steps[i]) for i in (self.step_index - 1, self.step_index + 1) if 0 <= i < len(steps)]
+        self.audio_pool.prefetch([self.audio_src(guide.steps[0]) for guide in self.guides] + neighbours)
+
+    def audio_src(self, step: GuideStep) -> str:
+        return ASSETS.audio_src(step.audio, max_kbps=self.audio_kbps)
 
     def build_guide_cards(self) -> ft.ResponsiveRow:
         cards: List[ft.Control] = []
         for guide in self.guides:
-            is_selected = guide.key == self.selected_guide.key
-            cards.append(
-                ft.Container(
-                    col={"xs":12, "sm":6, "md":4},
-                    padding=ft.padding.all(18),
-                    bgcolor=Colors.WHITE,
-                    border_radius=18,
-                    ink=True,
-                    on_click=lambda _, g=guide: self.select_guide(g),
-                    border=ft.border.all(1, SOFT_GOLD if is_selected else SOFT_GRAY),
-                    content=ft.Column(
-                        controls=[
-                            ft.Text(guide.name, weight=ft.FontWeight.BOLD, size=18, color=INK_BLACK),
-                            ft.Text(guide.subtitle, color="#666666"),
-                            ft.Container(
-                                height=4,
-                                bgcolor=SOFT_GOLD if is_selected else SOFT_GRAY,
-                                border_radius=12,
-                            ),
-                        ],
-                        spacing=6,
-                    ),
-                )
+            accent = ft.Container(height=4, bgcolor=SOFT_GRAY, border_radius=12)
+            card = ft.Container(
+                col={"xs":12, "sm":6, "md":4},
+                padding=ft.padding.all(18),
+                bgcolor=Colors.WHITE,
+                border_radius=18,
+                ink=True,
+                on_click=lambda _, g=guide: self.select_guide(g),
+                border=ft.border.all(1, SOFT_GRAY),
+                content=ft.Column(
+                    controls=[
+                        ft.Text(guide.name, weight=ft.FontWeight.BOLD, size=18, color=INK_BLACK),
+                        ft.Text(guide.subtitle, color="#666666"),
+                        accent,
+                    ],
+                    spacing=6,
+                ),
             )
+            self.guide_cards[guide.key] = (card, accent)
+            cards.append(card)
         return ft.ResponsiveRow(columns=12, run_spacing=16, spacing=16, controls=cards)
 
     def build_step_detail(self) -> ft.Control:
-        step = self.current_step
-        total_steps = len(self.selected_guide.steps)
+        self.step_image = ft.Image(height=STEP_IMAGE_HEIGHT, fit=ft.ImageFit.COVER, border_radius=20)
+        self.step_title = ft.Text(size=22, weight=ft.FontWeight.BOLD)
+        self.step_description = ft.Text(size=15, color="#444444")
+        self.arabic_text = ft.Text(weight=ft.FontWeight.BOLD, size=20, font_family=ARABIC_FONT)
+        self.transliteration_text = ft.Text(italic=True)
+        self.translation_text = ft.Text()
+        self.step_counter = ft.Text(weight=ft.FontWeight.BOLD)
+        self.previous_button = ft.IconButton(
+            icon=Icons.ARROW_BACK,
+            tooltip="Previous",
+            on_click=self.previous_step,
+        )
+        self.next_button = ft.FilledButton(
+            text="Next",
+            icon=Icons.ARROW_FORWARD,
+            style=ft.ButtonStyle(bgcolor=SOFT_GOLD),
+            on_click=self.next_step,
+        )
+
         triple_layout = ft.ResponsiveRow(
             columns=12,
             run_spacing=12,
@@ -448,7 +542,7 @@ class GuideApp:
                     content=ft.Column(
                         [
                             ft.Text("Arabic", size=13, color=SOFT_GOLD),
-                            ft.Text(step.arabic, weight=ft.FontWeight.BOLD, size=20),
+                            self.arabic_text,
                         ]
                     ),
                 ),
@@ -460,7 +554,7 @@ class GuideApp:
                     content=ft.Column(
                         [
                             ft.Text("Transliteration", size=13, color=SOFT_GOLD),
-                            ft.Text(step.transliteration, italic=True),
+                            self.transliteration_text,
                         ]
                     ),
                 ),
@@ -472,7 +566,7 @@ class GuideApp:
                     content=ft.Column(
                         [
                             ft.Text("English", size=13, color=SOFT_GOLD),
-                            ft.Text(step.translation),
+                            self.translation_text,
                         ]
                     ),
                 ),
@@ -482,24 +576,10 @@ class GuideApp:
         nav_controls = ft.Row(
             alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
             controls=[
-                ft.Text(f"Step {self.step_index + 1} of {total_steps}", weight=ft.FontWeight.BOLD),
+                self.step_counter,
                 ft.Row(
                     spacing=10,
-                    controls=[
-                        ft.IconButton(
-                            icon=Icons.ARROW_BACK,
-                            tooltip="Previous",
-                            disabled=self.step_index == 0,
-                            on_click=self.previous_step,
-                        ),
-                        ft.FilledButton(
-                            text="Next",
-                            icon=Icons.ARROW_FORWARD,
-                            style=ft.ButtonStyle(bgcolor=SOFT_GOLD),
-                            on_click=self.next_step,
-                            disabled=self.step_index == total_steps - 1,
-                        ),
-                    ],
+                    controls=[self.previous_button, self.next_button],
                 ),
             ],
         )
@@ -529,11 +609,14 @@ class GuideApp:
                         ],
                     ),
                 ),
+                ft.Container(col=12, content=self.progress_bar),
             ],
         )
 
+        # Horizontal drags only: vertical scrolling over the card no longer
+        # sends an event to the server.
         gesture_shell = ft.GestureDetector(
-            on_pan_end=self.on_step_swipe,
+            on_horizontal_drag_end=self.on_step_swipe,
             content=ft.Container(
                 padding=ft.padding.all(22),
                 bgcolor=Colors.WHITE,
@@ -541,9 +624,9 @@ class GuideApp:
                 content=ft.Column(
                     spacing=20,
                     controls=[
-                        ft.Image(src=step.image, height=260, fit=ft.ImageFit.COVER, border_radius=20),
-                        ft.Text(step.title, size=22, weight=ft.FontWeight.BOLD),
-                        ft.Text(step.description, size=15, color="#444444"),
+                        self.step_image,
+                        self.step_title,
+                        self.step_description,
                         triple_layout,
                         audio_row,
                         nav_controls,
@@ -554,20 +637,46 @@ class GuideApp:
 
         return gesture_shell
 
-    def render_prayers_view(self):
-        cards_row = self.build_guide_cards()
-        detail = self.build_step_detail()
+    def build_prayers_tab(self) -> ft.Control:
+        self.build_prayers_view()
+        return ft.Container(padding=ft.padding.all(0), content=self.prayers_view)
+
+    def build_prayers_view(self):
+        """Builds the Prayers tree once; later renders only patch it in place."""
         self.prayers_view.controls = [
             ft.Text("The First Pillar", size=28, weight=ft.FontWeight.BOLD, color=INK_BLACK),
             ft.Text(
                 "A calm companion for every prayer. Choose a guide, swipe through steps, or tap Next.",
                 color="#555555",
             ),
-            cards_row,
+            self.build_guide_cards(),
             ft.Container(height=1, bgcolor=SOFT_GRAY),
-            detail,
+            self.build_step_detail(),
         ]
-        self.prayers_view.update()
+        self.apply_selection()
+
+    def apply_selection(self):
+        for key, (card, accent) in self.guide_cards.items():
+            color = SOFT_GOLD if key == self.selected_guide.key else SOFT_GRAY
+            card.border = ft.border.all(1, color)
+            accent.bgcolor = color
+
+        view = step_view(CONTENT_PACK.version, self.selected_guide.key, self.step_index)
+        self.step_image.src = view.image_src
+        self.step_title.value = view.title
+        self.step_description.value = view.description
+        self.arabic_text.value = view.arabic
+        self.transliteration_text.value = view.transliteration
+        self.translation_text.value = view.translation
+        self.step_counter.value = view.counter
+        self.previous_button.disabled = view.is_first
+        self.next_button.disabled = view.is_last
+
+    def render_prayers_view(self):
+        if not self.prayers_tab.built:
+            return
+        self.apply_selection()
+        self.push(self.prayers_view)
 
 
 def main(page: ft.Page):
@@ -576,13 +685,14 @@ def main(page: ft.Page):
     page.bgcolor = CLOUD_WHITE
     page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
     page.scroll = ft.ScrollMode.AUTO
-    page.fonts = {
-        "Poppins": "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Regular.ttf",
-        "PoppinsBold": "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Bold.ttf",
-    }
+    page.fonts = {family: ASSETS.font(family, url) for family, url in FALLBACK_FONTS.items()}
+    arabic_font = ASSETS.font(ARABIC_FONT)
+    if arabic_font:
+        page.fonts[ARABIC_FONT] = arabic_font
     page.theme = ft.Theme(font_family="Poppins")
+    instrument_page(page)
 
-    GuideApp(page)
+    return GuideApp(page)
 
 
 if __name__ == "__main__":
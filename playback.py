@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, Optional
+
+import flet as ft
+
+AudioState = ft.audio.AudioState
+
+
+class Playback:
+    """Playback state of the active player, driven by the player's own events.
+
+    The client reports state changes, the clip duration and the position.
+    Position events arrive many times a second while a clip plays; progress()
+    turns them into at most one report per interval, and only when the
+    visible progress moved by at least min_change, so a long recitation costs
+    a handful of small updates instead of a stream of them.
+
+    play()/pause() record what was just asked of the player, so the UI can
+    answer a tap at once; the event that follows is then a no-op unless the
+    player did something else (ended, failed, was stopped).
+
+    A clip may be a slice [start_ms, end_ms) of a longer file; positions and
+    progress are then relative to that slice.
+    """
+
+    def __init__(self, interval: float = 1.0, min_change: float = 0.01, clock: Callable[[], float] = time.monotonic):
+        self.interval = interval
+        self.min_change = min_change
+        self.clock = clock
+        self.state = AudioState.STOPPED
+        self.src: Optional[str] = None
+        self.start_ms = 0
+        self.end_ms: Optional[int] = None
+        self.durations: Dict[str, int] = {}
+        self.position_ms = 0
+        self.reported = 0.0
+        self._reported_at = float("-inf")
+
+    @property
+    def playing(self) -> bool:
+        return self.state == AudioState.PLAYING
+
+    def switch(self, src: str, start_ms: int = 0, end_ms: Optional[int] = None):
+        """A new clip became active; it starts stopped at the beginning."""
+        self.src = src
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.stop()
+
+    def stop(self):
+        self.state = AudioState.STOPPED
+        self.position_ms = self.start_ms
+        self.reported = 0.0
+        self._reported_at = float("-inf")
+
+    def play(self):
+        self.state = AudioState.PLAYING
+
+    def pause(self):
+        self.state = AudioState.PAUSED
+
+    def on_state(self, state: AudioState) -> bool:
+        """Returns whether the state changed."""
+        changed, self.state = state != self.state, state
+        if state == AudioState.COMPLETED:
+            self.position_ms = self.end_ms or self.durations.get(self.src, self.position_ms)
+        return changed
+
+    def on_duration(self, src: str, duration_ms: int):
+        # Pooled players load ahead of time, so durations are kept per clip.
+        self.durations[src] = duration_ms
+
+    def fraction(self) -> float:
+        end = self.end_ms or self.durations.get(self.src)
+        if not end or end <= self.start_ms:
+            return 0.0
+        return max(0.0, min(1.0, (self.position_ms - self.start_ms) / (end - self.start_ms)))
+
+    def past_end(self) -> bool:
+        """Whether the player has run past the end of a slice."""
+        return self.end_ms is not None and self.position_ms >= self.end_ms
+
+    def progress(self, position_ms: int) -> Optional[float]:
+        """Records a position event; returns the progress to show, or None to skip this one."""
+        self.position_ms = position_ms
+        value = self.fraction()
+        now = self.clock()
+        if now - self._reported_at < self.interval or abs(value - self.reported) < self.min_change:
+            return None
+        self.reported = value
+        self._reported_at = now
+        return value
@@ -0,0 +1,588 @@
+"""Production entry point: several app worker processes behind one port.
+
+    python server.py --workers 4 --host 0.0.0.0 --port 8550
+
+* Every worker is its own process running ``main.main`` under ``ft.app`` on a
+  private loopback port, so sessions are spread over all cores instead of
+  sharing one GIL.
+* The front process is a small asyncio HTTP/WebSocket proxy. Clients are
+  pinned to a worker by a hash of their address, so a page's websocket and
+  any reconnect land on the process that holds its session.
+* Requests under ``/assets/`` never reach a worker. They are served straight
+  from disk, with ``immutable`` caching for the hashed files written by
+  tools/build_assets.py, precompressed ``.br``/``.gz`` siblings when the
+  client accepts them, conditional requests and byte ranges.
+* Once tools/build_pwa.py has run, ``/sw.js`` is served and the app page
+  registers it, so each guide's images and recitations are cached offline.
+* ``kill -HUP <pid>`` restarts the workers one at a time: a replacement is
+  started on a fresh port, new clients are routed to it, and the old process
+  gets ``--drain-seconds`` to let its open sessions finish before it is
+  stopped. A worker that dies on its own is restarted.
+  SIGTERM/SIGINT stop everything.
+* Workers are forked from a server process that has already imported flet,
+  and the content pack snapshot is compiled once up front, so starting or
+  replacing a worker costs little more than opening its port. App modules
+  are still imported by each worker, so a restart picks up code changes;
+  upgrading flet needs a full restart.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import email.utils
+import mimetypes
+import multiprocessing
+import os
+import re
+import signal
+import socket
+import sys
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from asset_manifest import ASSETS_DIR, DIST_DIR
+from content_pack import ContentPackError, load_content_pack
+
+ROOT = Path(__file__).resolve().parent
+ASSETS_PREFIX = "/assets/"
+# Written by tools/build_pwa.py; registered for the whole site from the app page.
+SERVICE_WORKER_URL = "/sw.js"
+SERVICE_WORKER_PATH = DIST_DIR / "sw.js"
+REGISTER_SERVICE_WORKER = (
+    b'<script>if ("serviceWorker" in navigator) '
+    b'navigator.serviceWorker.register("/sw.js", {scope: "/"});</script>'
+)
+MAX_HEAD_BYTES = 64 * 1024
+CHUNK_BYTES = 256 * 1024
+# Matches the content hash tools/build_assets.py puts in every dist file name.
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.[A-Za-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=3600"
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+# Imported once by the forkserver that workers are started from. flet is most
+# of a worker's start-up time (see tools/startup_report.py).
+WORKER_PRELOAD = ["flet"]
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-connection", "te", "trailer", "transfer-encoding", "upgrade"}
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("audio/mpeg", ".mp3")
+mimetypes.add_type("text/markdown", ".md")
+
+
+def log(message: str):
+    print(f"[server {os.getpid()}] {message}", file=sys.stderr, flush=True)
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+def worker_context() -> multiprocessing.context.BaseContext:
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(WORKER_PRELOAD)
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def prepare_content() -> bool:
+    """Compiles the content pack snapshot, so workers only read it."""
+    try:
+        load_content_pack()
+    except ContentPackError as e:
+        log(f"content pack is invalid: {e}")
+        return False
+    return True
+
+
+def run_worker(port: int):
+    """Process target: one ft.app web server on a loopback port."""
+    # Only the front process reacts to SIGHUP; a closing terminal must not kill workers mid-restart.
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    sys.path.insert(0, str(ROOT))
+    import flet as ft
+
+    from main import main
+
+    ft.app(target=main, host="127.0.0.1", port=port, view=None, assets_dir=str(ASSETS_DIR))
+
+
+@dataclass
+class Request:
+    method: str
+    target: str
+    version: str
+    headers: List[Tuple[str, str]]
+
+    def header(self, name: str, default: str = "") -> str:
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return default
+
+    @property
+    def path(self) -> str:
+        return unquote(urlsplit(self.target).path)
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.header("connection").lower()
+        if self.version == "HTTP/1.1":
+            return "close" not in connection
+        return "keep-alive" in connection
+
+    @property
+    def is_upgrade(self) -> bool:
+        return "upgrade" in self.header("connection").lower() and bool(self.header("upgrade"))
+
+
+def parse_head(head: bytes) -> Optional[Request]:
+    try:
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        return None
+    headers = []
+    for line in lines[1:]:
+        if not line:
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            return None
+        headers.append((key.strip(), value.strip()))
+    return Request(method, target, version, headers)
+
+
+async def read_head(reader: asyncio.StreamReader) -> Optional[bytes]:
+    try:
+        return await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+
+
+def response_head(status: str, headers: List[Tuple[str, str]]) -> bytes:
+    lines = [f"HTTP/1.1 {status}"] + [f"{key}: {value}" for key, value in headers]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parses a single ``bytes=`` range into inclusive (start, end); None if unsatisfiable."""
+    unit, _, spec = value.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            start = max(0, size - int(last))
+            end = size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+class StaticFiles:
+    """Serves files under root for GET/HEAD requests below prefix, plus the service worker."""
+
+    def __init__(self, root: Path = ASSETS_DIR, prefix: str = ASSETS_PREFIX):
+        self.root = root.resolve()
+        self.prefix = prefix
+
+    def matches(self, request: Request) -> bool:
+        return request.path.startswith(self.prefix) or request.path == SERVICE_WORKER_URL
+
+    def resolve(self, path: str) -> Optional[Path]:
+        if path == SERVICE_WORKER_URL:
+            return SERVICE_WORKER_PATH if SERVICE_WORKER_PATH.is_file() else None
+        candidate = (self.root / path[len(self.prefix):]).resolve()
+        if not candidate.is_relative_to(self.root) or not candidate.is_file():
+            return None
+        return candidate
+
+    async def serve(self, request: Request, writer: asyncio.StreamWriter) -> bool:
+        """Writes the response; returns whether the connection may be reused."""
+        keep_alive = request.keep_alive and not request.header("content-length").strip("0")
+        connection = [("Connection", "keep-alive" if keep_alive else "close")]
+        if request.method not in ("GET", "HEAD"):
+            writer.write(response_head("405 Method Not Allowed", [("Allow", "GET, HEAD"), ("Content-Length", "0")] + connection))
+            await writer.drain()
+            return keep_alive
+        path = self.resolve(request.path)
+        if path is None:
+            writer.write(response_head("404 Not Found", [("Content-Length", "0")] + connection))
+            await writer.drain()
+            return keep_alive
+
+        stat = path.stat()
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        headers = [
+            ("Content-Type", content_type),
+            ("Cache-Control", IMMUTABLE if HASHED_NAME.search(path.name) else REVALIDATE),
+            ("ETag", etag),
+            ("Last-Modified", email.utils.formatdate(stat.st_mtime, usegmt=True)),
+            ("Accept-Ranges", "bytes"),
+            ("Vary", "Accept-Encoding"),
+        ]
+        if path == SERVICE_WORKER_PATH:
+            # Browsers must see a new worker as soon as it is built.
+            headers[1] = ("Cache-Control", "no-cache")
+            headers.append(("Service-Worker-Allowed", "/"))
+        if etag in request.header("if-none-match"):
+            writer.write(response_head("304 Not Modified", headers + [("Content-Length", "0")] + connection))
+            await writer.drain()
+            return keep_alive
+
+        body_path, size, status = path, stat.st_size, "200 OK"
+        start, end = 0, size - 1
+        byte_range = request.header("range")
+        if byte_range and request.header("if-range", etag) == etag:
+            parsed = parse_range(byte_range, size)
+            if parsed is None:
+                writer.write(response_head("416 Range Not Satisfiable", [("Content-Range", f"bytes */{size}"), ("Content-Length", "0")] + connection))
+                await writer.drain()
+                return keep_alive
+            start, end = parsed
+            status = "206 Partial Content"
+            headers.append(("Content-Range", f"bytes {start}-{end}/{size}"))
+        else:
+            accepted = request.header("accept-encoding")
+            for encoding, suffix in ENCODINGS:
+                sibling = path.with_name(path.name + suffix)
+                if encoding in accepted and sibling.is_file():
+                    body_path, size = sibling, sibling.stat().st_size
+                    start, end = 0, size - 1
+                    headers.append(("Content-Encoding", encoding))
+                    break
+
+        writer.write(response_head(status, headers + [("Content-Length", str(end - start + 1))] + connection))
+        if request.method == "GET":
+            await self._send(body_path, start, end - start + 1, writer)
+        await writer.drain()
+        return keep_alive
+
+    @staticmethod
+    async def _send(path: Path, offset: int, length: int, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while length > 0:
+                chunk = await loop.run_in_executor(None, f.read, min(CHUNK_BYTES, length))
+                if not chunk:
+                    break
+                length -= len(chunk)
+                writer.write(chunk)
+                await writer.drain()
+
+
+@dataclass
+class Worker:
+    port: int
+    process: multiprocessing.Process
+    connections: int = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+
+class WorkerPool:
+    """A fixed number of worker slots, each holding one live worker process."""
+
+    def __init__(self, size: int, start_timeout: float, drain_seconds: float):
+        self.size = size
+        self.start_timeout = start_timeout
+        self.drain_seconds = drain_seconds
+        self.slots: List[Worker] = []
+        self.retiring: List[Worker] = []
+        self._context = worker_context()
+        self._restart_lock = asyncio.Lock()
+
+    def spawn(self) -> Worker:
+        port = free_port()
+        process = self._context.Process(target=run_worker, args=(port,), name=f"worker-{port}")
+        process.start()
+        return Worker(port, process)
+
+    async def wait_ready(self, worker: Worker) -> bool:
+        deadline = time.monotonic() + self.start_timeout
+        while time.monotonic() < deadline and worker.alive:
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", worker.port)
+            except OSError:
+                await asyncio.sleep(0.2)
+                continue
+            writer.close()
+            return True
+        return False
+
+    async def start(self):
+        await asyncio.to_thread(prepare_content)
+        self.slots = [self.spawn() for _ in range(self.size)]
+        ready = await asyncio.gather(*(self.wait_ready(worker) for worker in self.slots))
+        if not all(ready):
+            self.stop()
+            raise RuntimeError("workers did not start; run `python main.py` to see the error")
+        log(f"{self.size} workers ready on ports {', '.join(str(w.port) for w in self.slots)}")
+
+    def pick(self, client: str) -> Worker:
+        """The worker for a client address, skipping slots whose process has died."""
+        first = zlib.crc32(client.encode()) % len(self.slots)
+        for offset in range(len(self.slots)):
+            worker = self.slots[(first + offset) % len(self.slots)]
+            if worker.alive:
+                return worker
+        return self.slots[first]
+
+    async def rolling_restart(self):
+        if self._restart_lock.locked():
+            log("restart already in progress")
+            return
+        async with self._restart_lock:
+            log("rolling restart")
+            if not await asyncio.to_thread(prepare_content):
+                log("keeping the current workers")
+                return
+            for index in range(len(self.slots)):
+                await self._replace(index)
+            log("rolling restart done")
+
+    async def _replace(self, index: int):
+        replacement = self.spawn()
+        if not await self.wait_ready(replacement):
+            log(f"replacement for worker {self.slots[index].port} did not start; keeping the old one")
+            self._terminate(replacement)
+            return
+        old, self.slots[index] = self.slots[index], replacement
+        asyncio.ensure_future(self._retire(old))
+
+    async def _retire(self, worker: Worker):
+        self.retiring.append(worker)
+        deadline = time.monotonic() + self.drain_seconds
+        while worker.connections and time.monotonic() < deadline:
+            await asyncio.sleep(0.5)
+        self._terminate(worker)
+        await asyncio.get_running_loop().run_in_executor(None, worker.process.join, 10)
+        self.retiring.remove(worker)
+
+    async def monitor(self):
+        while True:
+            await asyncio.sleep(1)
+            if self._restart_lock.locked():
+                continue
+            for index, worker in enumerate(self.slots):
+                if not worker.alive:
+                    log(f"worker {worker.port} exited with {worker.process.exitcode}; restarting")
+                    await self._replace(index)
+
+    @staticmethod
+    def _terminate(worker: Worker):
+        if worker.alive:
+            worker.process.terminate()
+
+    def stop(self):
+        workers = self.slots + self.retiring
+        for worker in workers:
+            self._terminate(worker)
+        for worker in workers:
+            worker.process.join(10)
+            if worker.alive:
+                worker.process.kill()
+
+
+class FrontServer:
+    """Accepts client connections, serves static files and splices the rest to a worker."""
+
+    def __init__(self, pool: WorkerPool, static: StaticFiles, trust_forwarded: bool = False):
+        self.pool = pool
+        self.static = static
+        self.trust_forwarded = trust_forwarded
+
+    def client_address(self, request: Request, writer: asyncio.StreamWriter) -> str:
+        if self.trust_forwarded:
+            forwarded = request.header("x-forwarded-for").split(",")[0].strip()
+            if forwarded:
+                return forwarded
+        peer = writer.get_extra_info("peername")
+        return peer[0] if peer else ""
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                head = await read_head(reader)
+                if head is None:
+                    return
+                request = parse_head(head)
+                if request is None:
+                    writer.write(response_head("400 Bad Request", [("Content-Length", "0"), ("Connection", "close")]))
+                    await writer.drain()
+                    return
+                if self.static.matches(request):
+                    if not await self.static.serve(request, writer):
+                        return
+                    continue
+                await self.proxy(request, reader, writer)
+                return
+        except asyncio.LimitOverrunError:
+            writer.write(response_head("431 Request Header Fields Too Large", [("Content-Length", "0"), ("Connection", "close")]))
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def proxy(self, request: Request, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = self.client_address(request, writer)
+        worker = self.pool.pick(client)
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", worker.port)
+        except OSError:
+            writer.write(response_head("502 Bad Gateway", [("Content-Length", "0"), ("Connection", "close")]))
+            await writer.drain()
+            return
+        worker.connections += 1
+        document = self.is_document(request)
+        try:
+            upstream_writer.write(self.forward_head(request, client, identity=document))
+            if document:
+                await relay_document(upstream_reader, writer)
+            else:
+                await asyncio.gather(pipe(reader, upstream_writer), pipe(upstream_reader, writer))
+        finally:
+            worker.connections -= 1
+            upstream_writer.close()
+
+    @staticmethod
+    def is_document(request: Request) -> bool:
+        """Whether this is a page load that should get the service worker registration."""
+        return (
+            request.method == "GET"
+            and not request.is_upgrade
+            and "text/html" in request.header("accept")
+            and SERVICE_WORKER_PATH.is_file()
+        )
+
+    def forward_head(self, request: Request, client: str, identity: bool = False) -> bytes:
+        dropped = {"x-forwarded-for", "accept-encoding"} if identity else {"x-forwarded-for"}
+        headers = [(k, v) for k, v in request.headers if k.lower() not in dropped]
+        if not request.is_upgrade:
+            # One request per upstream connection: the next request from this
+            # client may be for /assets/, which only the front process serves.
+            headers = [(k, v) for k, v in headers if k.lower() not in HOP_BY_HOP or k.lower() == "transfer-encoding"]
+            headers.append(("Connection", "close"))
+        headers.append(("X-Forwarded-For", client))
+        lines = [f"{request.method} {request.target} {request.version}"] + [f"{k}: {v}" for k, v in headers]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def relay_document(upstream: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Copies an uncompressed HTML response, adding the service worker registration."""
+    head = await read_head(upstream)
+    if head is None:
+        writer.write(response_head("502 Bad Gateway", [("Content-Length", "0"), ("Connection", "close")]))
+        await writer.drain()
+        return
+    status_line, _, rest = head.decode("latin-1").partition("\r\n")
+    headers = [tuple(part.strip() for part in line.split(":", 1)) for line in rest.split("\r\n") if ":" in line]
+    names = {key.lower(): value for key, value in headers}
+    body = await upstream.read()
+    if "content-length" in names:
+        body = body[: int(names["content-length"])]
+    if (
+        status_line.split(" ")[1:2] == ["200"]
+        and names.get("content-type", "").startswith("text/html")
+        and "transfer-encoding" not in names
+        and "content-encoding" not in names
+    ):
+        body = inject_before(body, b"</head>", REGISTER_SERVICE_WORKER)
+    headers = [(k, v) for k, v in headers if k.lower() not in ("content-length", "connection", "transfer-encoding")]
+    if "transfer-encoding" in names:
+        # Not rewritten above, so the chunked body is passed on as is.
+        headers.append(("Transfer-Encoding", names["transfer-encoding"]))
+    else:
+        headers.append(("Content-Length", str(len(body))))
+    lines = [status_line] + [f"{key}: {value}" for key, value in headers] + ["Connection: close"]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+def inject_before(document: bytes, marker: bytes, snippet: bytes) -> bytes:
+    index = document.lower().find(marker)
+    if index < 0:
+        return document + snippet
+    return document[:index] + snippet + document[index:]
+
+
+async def pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            data = await reader.read(CHUNK_BYTES)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        if not writer.is_closing() and writer.can_write_eof():
+            try:
+                writer.write_eof()
+            except OSError:
+                pass
+
+
+async def serve(args: argparse.Namespace):
+    pool = WorkerPool(args.workers, args.start_timeout, args.drain_seconds)
+    await pool.start()
+    front = FrontServer(pool, StaticFiles(), trust_forwarded=args.trust_forwarded)
+    server = await asyncio.start_server(front.handle, args.host, args.port, limit=MAX_HEAD_BYTES)
+    log(f"listening on http://{args.host}:{args.port}")
+
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+        except NotImplementedError:
+            pass
+    if hasattr(signal, "SIGHUP"):
+        loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.ensure_future(pool.rolling_restart()))
+
+    monitor = asyncio.ensure_future(pool.monitor())
+    try:
+        await stopping.wait()
+    finally:
+        log("shutting down")
+        monitor.cancel()
+        server.close()
+        pool.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=8550, help="port to listen on (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: one per core)")
+    parser.add_argument("--drain-seconds", type=float, default=30, help="how long a replaced worker may keep its open sessions")
+    parser.add_argument("--start-timeout", type=float, default=60, help="seconds to wait for a worker to accept connections")
+    parser.add_argument("--trust-forwarded", action="store_true", help="use X-Forwarded-For for affinity (behind another proxy)")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
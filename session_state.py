@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Mapping, Optional, Sequence
+
+import flet as ft
+
+STORAGE_KEY = "first_pillar.session"
+STATE_FORMAT = 1
+
+
+@dataclass(frozen=True, slots=True)
+class SessionState:
+    """Where a visitor was: the guide, step, speed and loop setting."""
+
+    guide_key: str
+    step_index: int = 0
+    speed: str = "1.0"
+    loop: bool = False
+
+    def to_dict(self) -> dict:
+        return {"format": STATE_FORMAT, **asdict(self)}
+
+    @classmethod
+    def from_dict(cls, data: Any, step_counts: Mapping[str, int], speeds: Sequence[str]) -> Optional["SessionState"]:
+        """Validates stored data against the current content. Returns None when
+        it cannot be used at all; out-of-range values fall back to defaults."""
+        if not isinstance(data, dict) or data.get("format") != STATE_FORMAT:
+            return None
+        guide_key = data.get("guide_key")
+        if guide_key not in step_counts:
+            return None
+        step_index = data.get("step_index")
+        if not isinstance(step_index, int) or isinstance(step_index, bool) or not 0 <= step_index < step_counts[guide_key]:
+            step_index = 0
+        speed = data.get("speed")
+        loop = data.get("loop")
+        return cls(
+            guide_key=guide_key,
+            step_index=step_index,
+            speed=speed if speed in speeds else "1.0",
+            loop=loop if isinstance(loop, bool) else False,
+        )
+
+
+class SessionStore:
+    """Keeps a SessionState under one key in page.client_storage.
+
+    load() is one round trip and is meant to run before the first render, so
+    a reconnecting tab is built straight into its old view. save() only
+    records the latest state; it is written from a timer thread once changes
+    settle for delay seconds, so handlers never wait on the client and a
+    burst of steps costs one write. Unchanged state is never written.
+    """
+
+    def __init__(self, page: ft.Page, key: str = STORAGE_KEY, delay: float = 0.3):
+        self.page = page
+        self.key = key
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._pending: Optional[SessionState] = None
+        self._saved: Optional[SessionState] = None
+
+    def load(self, step_counts: Mapping[str, int], speeds: Sequence[str]) -> Optional[SessionState]:
+        try:
+            data = self.page.client_storage.get(self.key)
+        except Exception:
+            # Timed out or storage unavailable (e.g. private browsing); start fresh.
+            return None
+        state = SessionState.from_dict(data, step_counts, speeds)
+        self._saved = state
+        return state
+
+    def save(self, state: SessionState):
+        with self._lock:
+            if state == (self._pending or self._saved):
+                return
+            self._pending = state
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Writes the pending state now."""
+        with self._lock:
+            state, self._pending = self._pending, None
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = None
+            if state is None or state == self._saved:
+                return
+            self._saved = state
+        try:
+            self.page.client_storage.set(self.key, state.to_dict())
+        except Exception:
+            # The session went away; the next save or visit starts over.
+            with self._lock:
+                if self._saved == state:
+                    self._saved = None
+
+    def cancel(self):
+        """Drops any pending write, e.g. when the session is closed."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = None
+            self._pending = None
@@ -0,0 +1,8 @@
+"""Offline session benchmark for the First Pillar app.
+
+Runs real GuideApp sessions against an in-process fake Flet client that
+records every message the server would send, so it needs no browser, no
+Flet server and no network. Run it from the repository root:
+
+    python -m tools.bench --sessions 200 --actions 50
+"""
@@ -0,0 +1,158 @@
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from tools.bench.fake_page import FakeSession  # noqa: E402
+from tools.bench.scenarios import navigation_script, perform  # noqa: E402
+
+import main as app_module  # noqa: E402
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def start_session():
+    session = FakeSession()
+    mark = session.mark()
+    started = time.perf_counter()
+    app = app_module.main(session.page)
+    elapsed = time.perf_counter() - started
+    first_paint = sum(len(m) for m in session.sent_since(mark))
+    return session, app, elapsed, first_paint
+
+
+def run_session(seed: int, actions: int):
+    rng = random.Random(seed)
+    session, app, startup, first_paint = start_session()
+    samples = []
+    for action in navigation_script(rng, actions):
+        mark = session.mark()
+        cpu = time.thread_time()
+        started = time.perf_counter()
+        perform(app, action, rng)
+        wall = time.perf_counter() - started
+        cpu = time.thread_time() - cpu
+        sent = session.sent_since(mark)
+        samples.append((action, wall, cpu, len(sent), sum(len(m) for m in sent)))
+    app.swipes.cancel()
+    app.session_store.cancel()
+    session.close()
+    return startup, first_paint, samples
+
+
+def measure_memory(sessions: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    live = [start_session()[:2] for _ in range(sessions)]
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    for session, _ in live:
+        session.close()
+    return grown / sessions
+
+
+def summarize(args, startups, first_paints, samples, wall_total, memory):
+    by_action = defaultdict(list)
+    for sample in samples:
+        by_action[sample[0]].append(sample)
+
+    def stats(rows):
+        walls = [r[1] * 1000 for r in rows]
+        sizes = [r[4] for r in rows]
+        return {
+            "count": len(rows),
+            "p50_ms": round(percentile(walls, 50), 3),
+            "p99_ms": round(percentile(walls, 99), 3),
+            "messages_per_action": round(statistics.fmean(r[3] for r in rows), 2),
+            "bytes_per_action": round(statistics.fmean(sizes), 1),
+            "p99_bytes": percentile(sizes, 99),
+        }
+
+    cpu_per_action = statistics.fmean(s[2] for s in samples) if samples else 0.0
+    return {
+        "sessions": args.sessions,
+        "actions_per_session": args.actions,
+        "concurrency": args.concurrency,
+        "session_start": {
+            "p50_ms": round(percentile([s * 1000 for s in startups], 50), 3),
+            "p99_ms": round(percentile([s * 1000 for s in startups], 99), 3),
+            "first_paint_bytes": round(statistics.fmean(first_paints), 1),
+        },
+        "overall": stats(samples),
+        "actions": {name: stats(rows) for name, rows in sorted(by_action.items())},
+        "memory_per_session_kb": round(memory / 1024, 1),
+        "cpu_ms_per_action": round(cpu_per_action * 1000, 3),
+        # A core can keep up as long as each session's actions, spaced by the
+        # think time, take no more CPU than that core has.
+        "sessions_per_core": round(args.think_time / cpu_per_action) if cpu_per_action else None,
+        "throughput_actions_per_s": round(len(samples) / wall_total, 1),
+    }
+
+
+def print_report(report):
+    print(f"sessions: {report['sessions']} x {report['actions_per_session']} actions, concurrency {report['concurrency']}")
+    start = report["session_start"]
+    print(f"session start: p50 {start['p50_ms']} ms, p99 {start['p99_ms']} ms, first paint {start['first_paint_bytes']} B")
+    header = f"{'action':<16}{'count':>7}{'p50 ms':>10}{'p99 ms':>10}{'msgs':>7}{'bytes':>10}{'p99 B':>9}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["actions"].items()) + [("overall", report["overall"])]
+    for name, s in rows:
+        print(
+            f"{name:<16}{s['count']:>7}{s['p50_ms']:>10}{s['p99_ms']:>10}"
+            f"{s['messages_per_action']:>7}{s['bytes_per_action']:>10}{s['p99_bytes']:>9}"
+        )
+    print(f"memory per session: {report['memory_per_session_kb']} KiB")
+    print(f"cpu per action: {report['cpu_ms_per_action']} ms -> ~{report['sessions_per_core']} sessions/core")
+    print(f"throughput: {report['throughput_actions_per_s']} actions/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m tools.bench", description="Simulate concurrent GuideApp sessions.")
+    parser.add_argument("--sessions", type=int, default=100, help="number of simulated sessions")
+    parser.add_argument("--actions", type=int, default=40, help="navigation actions per session")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 4, help="sessions driven at once")
+    parser.add_argument("--think-time", type=float, default=5.0, help="seconds a real user waits between actions")
+    parser.add_argument("--memory-sessions", type=int, default=50, help="sessions kept alive to measure memory")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(run_session, range(args.seed, args.seed + args.sessions), [args.actions] * args.sessions))
+    wall_total = time.perf_counter() - started
+
+    startups = [r[0] for r in results]
+    first_paints = [r[1] for r in results]
+    samples = [sample for r in results for sample in r[2]]
+    memory = measure_memory(args.memory_sessions)
+
+    report = summarize(args, startups, first_paints, samples, wall_total, memory)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import flet as ft
+from flet.core.local_connection import LocalConnection
+from flet.core.protocol import Command, CommandEncoder, PageCommandResponsePayload, PageCommandsBatchResponsePayload
+
+# What a desktop web client reports when it registers.
+CLIENT_DETAILS = {
+    "route": "/",
+    "platform": "linux",
+    "web": "true",
+    "pwa": "false",
+    "width": "1280",
+    "height": "800",
+}
+
+
+class RecordingConnection(LocalConnection):
+    """A Flet connection that plays the client's part in-process.
+
+    Every batch of messages the server would put on the websocket is
+    JSON-encoded exactly as the real server does and recorded in
+    ``messages``. ``invokeMethod`` calls that wait for a result
+    (client_storage and friends) are answered from ``storage``.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.page: Optional[ft.Page] = None
+        self.messages: List[str] = []
+        self.storage: Dict[str, str] = {}
+
+    def send_command(self, session_id: str, command: Command):
+        result, message = self._process_command(command)
+        if message:
+            self._record([message])
+        if command.name == "invokeMethod":
+            self._answer_invoke_method(command)
+        return PageCommandResponsePayload(result=result, error="")
+
+    def send_commands(self, session_id: str, commands: List[Command]):
+        results = []
+        messages = []
+        for command in commands:
+            result, message = self._process_command(command)
+            if command.name in ["add", "get"]:
+                results.append(result)
+            if message:
+                messages.append(message)
+        if messages:
+            self._record(messages)
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+    def _record(self, messages):
+        payload = messages[0] if len(messages) == 1 else messages
+        self.messages.append(json.dumps(payload, cls=CommandEncoder, separators=(",", ":")))
+
+    def _answer_invoke_method(self, command: Command):
+        method_id, method_name, _ = command.values
+        key = command.attrs.get("key", "")
+        result = None
+        if method_name == "clientStorage:get":
+            result = json.dumps(self.storage[key]) if key in self.storage else None
+        elif method_name == "clientStorage:set":
+            self.storage[key] = command.attrs["value"]
+            result = "true"
+        elif method_name == "clientStorage:containskey":
+            result = "true" if key in self.storage else "false"
+        elif method_name == "clientStorage:remove":
+            result = "true" if self.storage.pop(key, None) is not None else "false"
+        handler = self.page.event_handlers.get("invoke_method_result")
+        data = json.dumps({"method_id": method_id, "result": result, "error": None})
+        handler(SimpleNamespace(data=data))
+
+
+class FakeSession:
+    """One simulated browser tab: a real ft.Page wired to a RecordingConnection."""
+
+    _ids = iter(range(1, 1 << 62))
+    _ids_lock = threading.Lock()
+
+    def __init__(self, storage: Optional[Dict[str, str]] = None):
+        with self._ids_lock:
+            session_id = f"bench-{next(self._ids)}"
+        self.connection = RecordingConnection()
+        if storage is not None:
+            self.connection.storage = storage
+        self.page = ft.Page(self.connection, session_id, asyncio.new_event_loop())
+        self.connection.page = self.page
+        for name, value in CLIENT_DETAILS.items():
+            self.page._set_attr(name, value, False)
+
+    def mark(self) -> int:
+        return len(self.connection.messages)
+
+    def sent_since(self, mark: int) -> List[str]:
+        return self.connection.messages[mark:]
+
+    def close(self):
+        self.page._close()
+        self.page.loop.close()
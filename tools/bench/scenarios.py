@@ -0,0 +1,69 @@
+import random
+from types import SimpleNamespace
+from typing import Callable, List, Tuple
+
+from playback import AudioState
+
+# Relative weights of what a user does between renders, roughly matching
+# how people move through a guide: mostly forward, some back-tracking,
+# occasional guide switches, playback and a rare look at the Info tab.
+ACTIONS: List[Tuple[str, int]] = [
+    ("next_step", 30),
+    ("previous_step", 12),
+    ("swipe_next", 12),
+    ("swipe_previous", 6),
+    ("select_guide", 14),
+    ("toggle_audio", 16),
+    ("switch_tab", 6),
+    ("reset_audio", 4),
+    ("clip_progress", 10),
+    ("clip_completed", 4),
+]
+
+
+def swipe(velocity_x: float) -> SimpleNamespace:
+    return SimpleNamespace(velocity_x=velocity_x, velocity_y=0.0)
+
+
+def player_event(player, **fields) -> SimpleNamespace:
+    return SimpleNamespace(control=player, **fields)
+
+
+def perform(app, action: str, rng: random.Random):
+    if action == "next_step":
+        app.next_step()
+    elif action == "previous_step":
+        app.previous_step()
+    elif action == "swipe_next":
+        app.on_step_swipe(swipe(-rng.uniform(400, 1200)))
+    elif action == "swipe_previous":
+        app.on_step_swipe(swipe(rng.uniform(400, 1200)))
+    elif action == "select_guide":
+        app.select_guide(rng.choice(app.guides))
+    elif action == "toggle_audio":
+        app.toggle_audio()
+    elif action == "reset_audio":
+        app.reset_audio()
+    elif action == "clip_progress":
+        # A second's worth of position events, as the client sends them while a clip plays.
+        if app.audio.src not in app.playback.durations:
+            app.on_audio_duration(player_event(app.audio, duration=rng.randint(4000, 20000)))
+        start = app.playback.position_ms
+        for offset in range(0, 1000, 50):
+            app.on_audio_position(player_event(app.audio, position=start + offset))
+    elif action == "clip_completed":
+        app.on_audio_state(player_event(app.audio, state=AudioState.COMPLETED))
+    elif action == "switch_tab":
+        app.tabs.selected_index = 1 - app.tabs.selected_index
+        app.on_tab_change(None)
+    else:
+        raise ValueError(f"unknown action {action!r}")
+
+
+def navigation_script(rng: random.Random, length: int) -> List[str]:
+    names = [name for name, _ in ACTIONS]
+    weights = [weight for _, weight in ACTIONS]
+    return rng.choices(names, weights=weights, k=length)
+
+
+Scenario = Callable[[object, random.Random], None]
@@ -0,0 +1,159 @@
+"""Builds content-hashed asset variants and assets/dist/manifest.json.
+
+For every image and audio file referenced by the content pack this writes:
+
+* a content-hashed copy of the original,
+* resized PNG/JPEG and WebP variants for the 260px step image (1x and 2x),
+  when Pillow is installed,
+* lower-bitrate MP3 renditions, when ffmpeg is on PATH,
+* .gz/.br siblings for compressible files (the manifest itself, SVGs).
+  PNG, WebP and MP3 are already compressed, so they are left alone.
+
+Hashed files never change, so they can be served with
+``Cache-Control: public, max-age=31536000, immutable``.
+
+Usage: python tools/build_assets.py [--clean]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import shutil
+import subprocess
+import sys
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from asset_manifest import DIST_DIR, MANIFEST_FORMAT, MANIFEST_PATH  # noqa: E402
+from content_pack import load_content_pack  # noqa: E402
+
+STEP_IMAGE_HEIGHT = 260
+IMAGE_DENSITIES = (1, 2)
+AUDIO_KBPS = (64, 32)
+COMPRESSIBLE = {".svg", ".json", ".js", ".css", ".txt", ".md"}
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def hashed_name(stem: str, data: bytes, suffix: str) -> str:
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{suffix}"
+
+
+def to_src(path: Path) -> str:
+    return path.relative_to(ROOT).as_posix()
+
+
+def emit(out_dir: Path, stem: str, data: bytes, suffix: str) -> Path:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / hashed_name(stem, data, suffix)
+    if not path.exists():
+        path.write_bytes(data)
+    if suffix in COMPRESSIBLE:
+        precompress(path)
+    return path
+
+
+def precompress(path: Path):
+    data = path.read_bytes()
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(data, quality=11))
+
+
+def build_image(source: Path) -> dict:
+    data = source.read_bytes()
+    out_dir = DIST_DIR / "images"
+    entry = {"src": to_src(emit(out_dir, source.stem, data, source.suffix)), "variants": []}
+    if Image is None:
+        return entry
+
+    try:
+        with Image.open(BytesIO(data)) as img:
+            heights = sorted({min(STEP_IMAGE_HEIGHT * density, img.height) for density in IMAGE_DENSITIES})
+            for height in heights:
+                width = max(1, round(img.width * height / img.height))
+                resized = img.resize((width, height), Image.LANCZOS) if height != img.height else img.copy()
+                for fmt, suffix, options in (
+                    ("webp", ".webp", {"quality": 80, "method": 6}),
+                    (img.format or "PNG", source.suffix, {"optimize": True}),
+                ):
+                    buf = BytesIO()
+                    frame = resized.convert("RGBA") if fmt == "webp" else resized
+                    frame.save(buf, format=fmt, **options)
+                    path = emit(out_dir, f"{source.stem}.h{height}", buf.getvalue(), suffix)
+                    entry["variants"].append({"height": height, "format": fmt.lower(), "src": to_src(path)})
+    except OSError as e:
+        print(f"  could not decode {source.name}, shipping the original only: {e}")
+    return entry
+
+
+def build_audio(source: Path, ffmpeg: str) -> dict:
+    data = source.read_bytes()
+    out_dir = DIST_DIR / "audio"
+    entry = {"src": to_src(emit(out_dir, source.stem, data, source.suffix)), "renditions": []}
+    if not ffmpeg:
+        return entry
+
+    for kbps in AUDIO_KBPS:
+        result = subprocess.run(
+            [ffmpeg, "-v", "error", "-i", str(source), "-ac", "1", "-b:a", f"{kbps}k", "-f", "mp3", "-"],
+            capture_output=True,
+        )
+        if result.returncode != 0 or not result.stdout:
+            print(f"  ffmpeg failed for {source.name} @ {kbps}k: {result.stderr.decode(errors='replace').strip()}")
+            continue
+        if len(result.stdout) >= len(data):
+            # The source is already at or below this bitrate.
+            continue
+        path = emit(out_dir, f"{source.stem}.{kbps}k", result.stdout, ".mp3")
+        entry["renditions"].append({"kbps": kbps, "src": to_src(path)})
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clean", action="store_true", help="remove assets/dist before building")
+    args = parser.parse_args()
+
+    if args.clean and DIST_DIR.exists():
+        shutil.rmtree(DIST_DIR)
+
+    pack = load_content_pack()
+    image_paths = sorted({step.image for guide in pack.guides for step in guide.steps})
+    audio_paths = sorted({step.audio for guide in pack.guides for step in guide.steps})
+
+    if Image is None:
+        print("Pillow is not installed; skipping resized/WebP image variants (pip install Pillow).")
+    ffmpeg = shutil.which("ffmpeg") or ""
+    if not ffmpeg:
+        print("ffmpeg was not found on PATH; skipping lower-bitrate audio renditions.")
+    if brotli is None:
+        print("brotli is not installed; writing .gz copies only (pip install brotli).")
+
+    manifest = {"format": MANIFEST_FORMAT, "images": {}, "audio": {}}
+    for src in image_paths:
+        print(f"image {src}")
+        manifest["images"][src] = build_image(ROOT / src)
+    for src in audio_paths:
+        print(f"audio {src}")
+        manifest["audio"][src] = build_audio(ROOT / src, ffmpeg)
+
+    DIST_DIR.mkdir(parents=True, exist_ok=True)
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    precompress(MANIFEST_PATH)
+    print(f"wrote {to_src(MANIFEST_PATH)} ({len(image_paths)} images, {len(audio_paths)} audio files)")
+
+
+if __name__ == "__main__":
+    main()
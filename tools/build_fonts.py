@@ -0,0 +1,178 @@
+"""Vendors and subsets the UI fonts into assets/dist/fonts/ and writes assets/dist/fonts.json.
+
+Each family below is downloaded once into fonts/; commit those files to build
+offline. The font is cut down to the characters the app can show and written
+as a content-hashed TTF plus a WOFF2 copy:
+
+* Latin families get every string literal in the UI modules, the Latin text
+  of the content pack (Info page, guide and step titles, descriptions,
+  transliterations, translations) and printable ASCII for anything formatted
+  at runtime, such as the step counter.
+* The Arabic family gets the Arabic text of every step. Its shaping tables
+  are kept, so joined letter forms and marks still render.
+
+Flutter only loads TrueType/OpenType fonts, so page.fonts points at the TTF.
+The TTF also gets .gz/.br siblings, which server.py sends to clients that
+accept them; over the wire that is about the size of the WOFF2.
+
+Requires fontTools (pip install fonttools); WOFF2 output also needs brotli.
+
+Usage: python tools/build_fonts.py [--offline] [--source-dir DIR]
+"""
+import argparse
+import ast
+import json
+import string
+import sys
+import urllib.request
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from asset_manifest import DIST_DIR, FONTS_PATH, MANIFEST_FORMAT  # noqa: E402
+from build_assets import emit, precompress, to_src  # noqa: E402
+from content_pack import ContentPack, load_content_pack  # noqa: E402
+
+SOURCE_DIR = ROOT / "fonts"
+OUT_DIR = DIST_DIR / "fonts"
+UI_MODULES = ("main.py",)
+LATIN_EXTRA = string.printable.strip() + "  –—‘’“”…•·"
+ARABIC_EXTRA = "  ،؛؟ـ‌‍"
+
+try:
+    from fontTools import subset
+except ImportError:
+    subset = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+@dataclass(frozen=True)
+class FontSource:
+    family: str
+    filename: str
+    url: str
+    script: str
+
+
+FONTS = (
+    FontSource("Poppins", "Poppins-Regular.ttf", "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Regular.ttf", "latin"),
+    FontSource("PoppinsBold", "Poppins-Bold.ttf", "https://github.com/google/fonts/raw/main/ofl/poppins/Poppins-Bold.ttf", "latin"),
+    FontSource(
+        "NotoNaskhArabic",
+        "NotoNaskhArabic-Bold.ttf",
+        "https://github.com/notofonts/notofonts.github.io/raw/main/fonts/NotoNaskhArabic/hinted/ttf/NotoNaskhArabic-Bold.ttf",
+        "arabic",
+    ),
+)
+
+
+def ui_strings(modules: Iterable[str]) -> Iterable[str]:
+    """Every string literal in the UI modules, f-string parts included."""
+    for module in modules:
+        tree = ast.parse((ROOT / module).read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                yield node.value
+
+
+def content_text(pack: ContentPack) -> Tuple[str, str]:
+    """Returns the (latin, arabic) text of the content pack."""
+    latin = [pack.info_md]
+    arabic = []
+    for guide in pack.guides:
+        latin += [guide.name, guide.subtitle]
+        for step in guide.steps:
+            latin += [step.title, step.description, step.transliteration, step.translation]
+            arabic.append(step.arabic)
+    return "".join(latin), "".join(arabic)
+
+
+def fetch(source: FontSource, source_dir: Path, offline: bool) -> Optional[Path]:
+    path = source_dir / source.filename
+    if path.exists():
+        return path
+    if offline:
+        print(f"  {path.name} is missing and --offline was given; skipping {source.family}")
+        return None
+    print(f"  downloading {source.url}")
+    try:
+        with urllib.request.urlopen(source.url, timeout=60) as response:
+            data = response.read()
+    except OSError as e:
+        print(f"  download failed, skipping {source.family}: {e}")
+        return None
+    source_dir.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def subset_font(path: Path, characters: str) -> Tuple[bytes, Optional[bytes]]:
+    """Returns the subset font as TTF bytes and, when brotli is available, WOFF2 bytes."""
+    options = subset.Options()
+    options.layout_features = ["*"]
+    options.hinting = False
+    options.desubroutinize = True
+    font = subset.load_font(str(path), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=characters)
+    subsetter.subset(font)
+
+    ttf = BytesIO()
+    font.flavor = None
+    font.save(ttf)
+    if brotli is None:
+        return ttf.getvalue(), None
+    woff2 = BytesIO()
+    font.flavor = "woff2"
+    font.save(woff2)
+    return ttf.getvalue(), woff2.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--offline", action="store_true", help="do not download missing source fonts")
+    parser.add_argument("--source-dir", type=Path, default=SOURCE_DIR, help="where the full source fonts live (default: fonts/)")
+    args = parser.parse_args()
+
+    if subset is None:
+        sys.exit("fontTools is not installed (pip install fonttools).")
+    if brotli is None:
+        print("brotli is not installed; writing TTF subsets without WOFF2 copies (pip install brotli).")
+
+    latin, arabic = content_text(load_content_pack())
+    characters = {
+        "latin": "".join(sorted(set(latin + "".join(ui_strings(UI_MODULES)) + LATIN_EXTRA) - {"\n", "\r", "\t"})),
+        "arabic": "".join(sorted(set(arabic + ARABIC_EXTRA))),
+    }
+
+    fonts = {}
+    for source in FONTS:
+        print(f"font {source.family}")
+        path = fetch(source, args.source_dir, args.offline)
+        if path is None:
+            continue
+        ttf, woff2 = subset_font(path, characters[source.script])
+        stem = path.stem.lower()
+        ttf_path = emit(OUT_DIR, stem, ttf, ".ttf")
+        precompress(ttf_path)
+        entry = {"ttf": to_src(ttf_path), "characters": len(characters[source.script])}
+        if woff2 is not None:
+            entry["woff2"] = to_src(emit(OUT_DIR, stem, woff2, ".woff2"))
+        fonts[source.family] = entry
+        print(f"  {path.stat().st_size:,} -> {len(ttf):,} bytes TTF" + (f", {len(woff2):,} bytes WOFF2" if woff2 else ""))
+
+    FONTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    FONTS_PATH.write_text(json.dumps({"format": MANIFEST_FORMAT, "fonts": fonts}, indent=2) + "\n", encoding="utf-8")
+    print(f"wrote {to_src(FONTS_PATH)} ({len(fonts)} of {len(FONTS)} families)")
+
+
+if __name__ == "__main__":
+    main()
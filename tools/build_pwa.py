@@ -0,0 +1,82 @@
+"""Generates the service worker and precache manifest for the web build.
+
+Writes:
+
+* assets/dist/pwa/precache-manifest.<hash>.json: for every guide, the URLs
+  of its step images and recitations as the app resolves them (one audio
+  list per bitrate the app may pick), plus the shell files every visitor
+  needs (the self-hosted fonts).
+* assets/dist/sw.js: tools/pwa/sw.js pointed at that manifest. The manifest
+  name changes with its content, so the browser picks up a new worker, and
+  drops the old cache, whenever the content or asset build changes.
+
+Run it after tools/build_assets.py and tools/build_fonts.py, which produce
+the files it lists. server.py serves the worker as /sw.js and adds the
+registration script to the app's HTML page.
+
+Usage: python tools/build_pwa.py
+"""
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from asset_manifest import DIST_DIR, MANIFEST_FORMAT, AssetManifest  # noqa: E402
+from build_assets import STEP_IMAGE_HEIGHT, emit, to_src  # noqa: E402
+from content_pack import Guide, load_content_pack  # noqa: E402
+
+TEMPLATE_PATH = Path(__file__).resolve().parent / "pwa" / "sw.js"
+SERVICE_WORKER_PATH = DIST_DIR / "sw.js"
+PWA_DIR = DIST_DIR / "pwa"
+# The bitrates GuideApp.audio_src() may ask for: unlimited on desktop, and
+# main.MOBILE_AUDIO_KBPS on phones.
+AUDIO_TIERS = (None, 64)
+
+
+def url(src: str) -> str:
+    return "/" + src.lstrip("/")
+
+
+def tier_name(kbps: Optional[int]) -> str:
+    return "full" if kbps is None else str(kbps)
+
+
+def guide_entry(guide: Guide, assets: AssetManifest) -> dict:
+    images: List[str] = []
+    audio = {tier_name(kbps): [] for kbps in AUDIO_TIERS}
+    for step in guide.steps:
+        images.append(url(assets.image(step.image, STEP_IMAGE_HEIGHT)))
+        for kbps in AUDIO_TIERS:
+            audio[tier_name(kbps)].append(url(assets.audio_src(step.audio, max_kbps=kbps)))
+    return {
+        "images": list(dict.fromkeys(images)),
+        "audio": {tier: list(dict.fromkeys(urls)) for tier, urls in audio.items()},
+    }
+
+
+def main():
+    pack = load_content_pack()
+    assets = AssetManifest.load()
+    if not assets.images and not assets.audio:
+        print("assets/dist/manifest.json was not found; listing the unhashed assets (run tools/build_assets.py first).")
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "version": pack.version,
+        "shell": sorted(url(entry["ttf"]) for entry in assets.fonts.values()),
+        "guides": {guide.key: guide_entry(guide, assets) for guide in pack.guides},
+    }
+    data = (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode("utf-8")
+    manifest_path = emit(PWA_DIR, "precache-manifest", data, ".json")
+
+    worker = TEMPLATE_PATH.read_text(encoding="utf-8").replace("__PRECACHE_MANIFEST__", url(to_src(manifest_path)))
+    SERVICE_WORKER_PATH.write_text(worker, encoding="utf-8")
+    files = {u for g in manifest["guides"].values() for u in g["images"] + sum(g["audio"].values(), [])}
+    print(f"wrote {to_src(SERVICE_WORKER_PATH)} and {to_src(manifest_path)} ({len(pack.guides)} guides, {len(files)} files)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+// Service worker for the web build. tools/build_pwa.py fills in the hashed
+// precache manifest URL and writes the result to assets/dist/sw.js, which
+// server.py serves as /sw.js.
+//
+// Everything under /assets/ is served cache-first, and byte ranges (used by
+// the audio player) are cut from the cached file. A range of a file that is
+// not cached yet goes straight to the server, so a long recitation starts,
+// and seeks, after a few ranges rather than after the whole download; the
+// full file is cached alongside. When the page fetches a
+// file that belongs to exactly one guide, the rest of that guide's images
+// and recitations are downloaded in the background, so later steps and
+// replays never wait on the network. Files shared by several guides are
+// simply cached on first use.
+const PRECACHE_MANIFEST = "__PRECACHE_MANIFEST__";
+const CACHE_PREFIX = "first-pillar-";
+const CACHE = CACHE_PREFIX + PRECACHE_MANIFEST;
+const ASSET_PREFIX = "/assets/";
+
+const precached = new Set();
+let indexPromise = null;
+// The recitation bitrate this client plays ("full" or a kbps value), learned
+// from the audio files it asks for.
+let audioTier = null;
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    (async () => {
+      const cache = await caches.open(CACHE);
+      await cache.add(PRECACHE_MANIFEST);
+      const manifest = await (await cache.match(PRECACHE_MANIFEST)).json();
+      await cache.addAll(manifest.shell);
+      await self.skipWaiting();
+    })()
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    (async () => {
+      for (const name of await caches.keys()) {
+        if (name.startsWith(CACHE_PREFIX) && name !== CACHE) {
+          await caches.delete(name);
+        }
+      }
+      await self.clients.claim();
+    })()
+  );
+});
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (request.method !== "GET" || url.origin !== self.location.origin || !url.pathname.startsWith(ASSET_PREFIX)) {
+    return;
+  }
+  event.respondWith(respond(request, url.pathname, event));
+  event.waitUntil(noteUse(url.pathname).catch(() => {}));
+});
+
+async function respond(request, path, event) {
+  const cache = await caches.open(CACHE);
+  let response = await cache.match(path);
+  if (!response && request.headers.has("range")) {
+    event.waitUntil(cacheFile(cache, path).catch(() => {}));
+    return fetch(request);
+  }
+  if (!response) {
+    // Always fetch and keep the whole file; ranges are served from the copy.
+    response = await fetch(path);
+    if (response.status !== 200) {
+      return response;
+    }
+    await cache.put(path, response.clone());
+  }
+  const range = request.headers.get("range");
+  return range ? sliceResponse(response, range) : response;
+}
+
+async function sliceResponse(response, range) {
+  const blob = await response.blob();
+  const size = blob.size;
+  const match = /^bytes=(\d*)-(\d*)$/.exec(range.trim());
+  let start = NaN;
+  let end = size - 1;
+  if (match && match[1]) {
+    start = Number(match[1]);
+    if (match[2]) {
+      end = Math.min(Number(match[2]), size - 1);
+    }
+  } else if (match && match[2]) {
+    start = Math.max(0, size - Number(match[2]));
+  }
+  if (!(start <= end)) {
+    return new Response(null, { status: 416, headers: { "Content-Range": `bytes */${size}` } });
+  }
+  return new Response(blob.slice(start, end + 1), {
+    status: 206,
+    headers: {
+      "Content-Type": response.headers.get("Content-Type") || "application/octet-stream",
+      "Content-Range": `bytes ${start}-${end}/${size}`,
+      "Content-Length": String(end - start + 1),
+    },
+  });
+}
+
+const caching = new Map();
+
+function cacheFile(cache, path) {
+  // Several ranges of one file arrive at once; download it only once.
+  if (!caching.has(path)) {
+    caching.set(
+      path,
+      (async () => {
+        const response = await fetch(path);
+        if (response.status === 200) {
+          await cache.put(path, response);
+        }
+      })().finally(() => caching.delete(path))
+    );
+  }
+  return caching.get(path);
+}
+
+function loadIndex() {
+  if (!indexPromise) {
+    indexPromise = (async () => {
+      const cache = await caches.open(CACHE);
+      const response = (await cache.match(PRECACHE_MANIFEST)) || (await fetch(PRECACHE_MANIFEST));
+      return buildIndex(await response.json());
+    })();
+    indexPromise.catch(() => {
+      indexPromise = null;
+    });
+  }
+  return indexPromise;
+}
+
+function buildIndex(manifest) {
+  const owners = new Map();
+  const tiers = new Map();
+  const own = (url, key) => {
+    if (!owners.has(url)) {
+      owners.set(url, new Set());
+    }
+    owners.get(url).add(key);
+  };
+  for (const [key, guide] of Object.entries(manifest.guides)) {
+    guide.images.forEach((url) => own(url, key));
+    for (const [tier, urls] of Object.entries(guide.audio)) {
+      for (const url of urls) {
+        own(url, key);
+        // A file that several tiers share says nothing about the bitrate in use.
+        tiers.set(url, tiers.has(url) && tiers.get(url) !== tier ? null : tier);
+      }
+    }
+  }
+  return { manifest, owners, tiers };
+}
+
+async function noteUse(path) {
+  const index = await loadIndex();
+  const tier = index.tiers.get(path);
+  if (tier) {
+    audioTier = tier;
+  }
+  const owners = index.owners.get(path);
+  if (owners && owners.size === 1) {
+    const [key] = owners;
+    await precacheGuide(index.manifest.guides[key], key);
+  }
+}
+
+async function precacheGuide(guide, key) {
+  const id = `${key}:${audioTier}`;
+  if (precached.has(id)) {
+    return;
+  }
+  precached.add(id);
+  const urls = guide.images.concat(audioTier ? guide.audio[audioTier] || [] : []);
+  const cache = await caches.open(CACHE);
+  await Promise.all(
+    urls.map(async (url) => {
+      if (await cache.match(url)) {
+        return;
+      }
+      try {
+        const response = await fetch(url);
+        if (response.status === 200) {
+          await cache.put(url, response);
+        }
+      } catch (e) {
+        // Offline again; try this guide once more on its next use.
+        precached.delete(id);
+      }
+    })
+  );
+}